@@ -1,6 +1,7 @@
 import re
 import string
 from collections import Counter
+from encoder import Encoder
 
 class Analizer:
     def __init__(self):
@@ -52,20 +53,15 @@ class Analizer:
         Returns:
             collections.Counter: A counter object with character frequencies.
         """
-        if bracket_index == 0:
-            raw_byte = r'(~[0-9A-Fa-f]{2}~)'
-        elif bracket_index == 1:
-            raw_byte = r'(\[[0-9A-Fa-f]{2}\])'
-        elif bracket_index == 2:
-            raw_byte = r'(\{[0-9A-Fa-f]{2}\})'
-        elif bracket_index == 3:
-            raw_byte = r'(<[0-9A-Fa-f]{2}>)'
-            
+        tokenizer = Encoder.compile_tokenizer(bracket_index)
         char_counter = Counter()
 
         for line in script:
-            clean_raw_bytes = re.sub(raw_byte, '', line)
-            char_counter.update(clean_raw_bytes)
+            # Count text runs only, raw bytes are skipped
+            for token in tokenizer.finditer(line):
+                text = token.group(2)
+                if text is not None:
+                    char_counter.update(text)
 
         return char_counter
 
@@ -22,9 +22,11 @@ import sys
 import os
 import io
 import json
+from multiprocessing import freeze_support
 from config import app_name, version, author, date, hour, license, url, resources_path, icon_file
 from decoder import Decoder
 from encoder import Encoder
+from rom import Rom, RomPatch
 from lempel_ziv import Lempel_ziv
 from analizer import Analizer
 from cli import CLI
@@ -55,7 +57,9 @@ class Functions:
 
         # Advanced Options Fields (Uncompressed Text Fields)
         self.main_window.not_comment_lines_checkbox.setChecked(False)
+        self.main_window.optimal_encoding_checkbox.setChecked(False)
         self.main_window.use_custom_brackets_for_hex_codes_list.setCurrentIndex(0)
+        self.main_window.jobs_input.setText("1")
         self.main_window.fill_free_space_byte_checkbox.setChecked(False)
         self.main_window.fill_free_space_byte_input.setText("FF")  
         self.main_window.use_split_pointers_checkbox.setChecked(False)
@@ -68,6 +72,7 @@ class Functions:
         self.main_window.use_compression_algorithm_method_checkbox.setChecked(False)
         self.main_window.compression_method_list.setCurrentIndex(0)
         self.main_window.compression_type_list.setCurrentIndex(0)
+        self.main_window.compression_optimal_checkbox.setChecked(False)
         
         # Script analisys tools Fields
         self.main_window.search_combination_checkbox.setChecked(False)
@@ -152,6 +157,8 @@ class Functions:
         self.main_window.compression_type_list.setEnabled(not is_checked)
         self.main_window.compression_method_list.setDisabled(not is_checked)
         self.main_window.compression_type_list.setDisabled(not is_checked)
+        self.main_window.compression_optimal_checkbox.setEnabled(not is_checked)
+        self.main_window.compression_optimal_checkbox.setDisabled(not is_checked)
 
     def toggle_seach_combinations(self, state):
         is_checked = self.main_window.search_combination_checkbox.isChecked()
@@ -206,6 +213,7 @@ class Functions:
         use_split_pointers_method = self.main_window.use_split_pointers_checkbox.isChecked()
         no_use_end_lines_for_split = self.main_window.not_use_end_line_checkbox.isChecked()
         endianness = self.main_window.endianness_list.currentIndex() 
+        jobs = int(self.main_window.jobs_input.text() or 1)
 
         try:
             # VARIABLE OPTIONS
@@ -227,118 +235,122 @@ class Functions:
             print("Error: Extraction aborted!")
             self.main_window.progress_bar.setValue(0)
             return
-        
-        #GET POINTERS
-        if use_split_pointers_method:
-            try:
-                lsb_ptr_offset = int(self.main_window.lsb_offset_input.text(), 16)
-                msb_ptr_offset = int(self.main_window.msb_offset_input.text(), 16)
-                split_ptr_size = int(self.main_window.size_input.text(), 16)
-            except (ValueError, UnboundLocalError):
-                self.show_error_dialog("Please fill in all required fields.")
-                print("Error: Extraction aborted!")
-                self.main_window.progress_bar.setValue(0)
-                return
-            lsb = Decoder.read_rom(rom_file, lsb_ptr_offset, split_ptr_size)
-            msb = Decoder.read_rom(rom_file, msb_ptr_offset, split_ptr_size)
-            format_pointers = Decoder.process_pointers_split_2_bytes(lsb, msb, base)
-##            for ptr in format_pointers:
-##                print(f"Pointer: 0x{ptr:06X}")
-        else:
-            try:
-                pointers_start_offset = int(self.main_window.pointers_start_offset_input.text(), 16)
-                pointers_end_offset = int(self.main_window.pointers_end_offset_input.text(), 16)
-            except (ValueError, UnboundLocalError):
-                self.show_error_dialog("Please fill in all required fields.")
-                print("Error: Extraction aborted!")
-                self.main_window.progress_bar.setValue(0)
-                return
-            if pointers_start_offset > pointers_end_offset:
-                self.show_error_dialog("Pointers start offset can't be higher than pointers end offset.")
-                print("Error: Extraction aborted!")
-                return
-            pointers_size = pointers_end_offset - pointers_start_offset + 1
-            try:
-                table_pointers = Decoder.read_rom(rom_file, pointers_start_offset, pointers_size)
-            except Exception as e:
-                self.show_error_dialog(f"{e}")
-                print("Error: Extraction aborted!")
-                self.main_window.progress_bar.setValue(0)
-                return
-                       
-            if self.main_window.radio_2_bytes.isChecked():
-                format_pointers = Decoder.process_pointers_2_bytes(table_pointers, base, endianness)
-                pointers_length = 2
-                
-            elif self.main_window.radio_3_bytes.isChecked():
-                format_pointers = Decoder.process_pointers_3_bytes(table_pointers, base, endianness)
-                pointers_length = 3
-                
-            elif self.main_window.radio_4_bytes.isChecked():                
-                format_pointers = Decoder.process_pointers_4_bytes(table_pointers, base, endianness)
-                pointers_length = 4
-        self.main_window.progress_bar.setValue(10)
 
-        # Load ROM data to RAM
+        # Map ROM file
         try:
-            rom_data = Decoder.read_rom(rom_file, 0, os.path.getsize(rom_file))
-            self.main_window.progress_bar.setValue(15)
+            rom = Rom(rom_file)
         except Exception as e:
             self.show_error_dialog(f"{e}")
             print("Error: Extraction aborted!")
             self.main_window.progress_bar.setValue(0)
             return
         
-        # Load char table to RAM
         try:
-            char_table = Decoder.read_tbl(tbl_file)
-            self.main_window.progress_bar.setValue(20)
-        except Exception as e:
-            self.show_error_dialog(f"{e}")
-            print("Error: Extraction aborted!")
-            self.main_window.progress_bar.setValue(0)
-            return
+            #GET POINTERS
+            if use_split_pointers_method:
+                try:
+                    lsb_ptr_offset = int(self.main_window.lsb_offset_input.text(), 16)
+                    msb_ptr_offset = int(self.main_window.msb_offset_input.text(), 16)
+                    split_ptr_size = int(self.main_window.size_input.text(), 16)
+                except (ValueError, UnboundLocalError):
+                    self.show_error_dialog("Please fill in all required fields.")
+                    print("Error: Extraction aborted!")
+                    self.main_window.progress_bar.setValue(0)
+                    return
+                lsb = rom.read(lsb_ptr_offset, split_ptr_size)
+                msb = rom.read(msb_ptr_offset, split_ptr_size)
+                format_pointers = Decoder.process_pointers_split_2_bytes(lsb, msb, base)
+    ##            for ptr in format_pointers:
+    ##                print(f"Pointer: 0x{ptr:06X}")
+            else:
+                try:
+                    pointers_start_offset = int(self.main_window.pointers_start_offset_input.text(), 16)
+                    pointers_end_offset = int(self.main_window.pointers_end_offset_input.text(), 16)
+                except (ValueError, UnboundLocalError):
+                    self.show_error_dialog("Please fill in all required fields.")
+                    print("Error: Extraction aborted!")
+                    self.main_window.progress_bar.setValue(0)
+                    return
+                if pointers_start_offset > pointers_end_offset:
+                    self.show_error_dialog("Pointers start offset can't be higher than pointers end offset.")
+                    print("Error: Extraction aborted!")
+                    return
+                pointers_size = pointers_end_offset - pointers_start_offset + 1
+                try:
+                    table_pointers = rom.read(pointers_start_offset, pointers_size)
+                except Exception as e:
+                    self.show_error_dialog(f"{e}")
+                    print("Error: Extraction aborted!")
+                    self.main_window.progress_bar.setValue(0)
+                    return
+                       
+                if self.main_window.radio_2_bytes.isChecked():
+                    format_pointers = Decoder.process_pointers_2_bytes(table_pointers, base, endianness)
+                    pointers_length = 2
+                
+                elif self.main_window.radio_3_bytes.isChecked():
+                    format_pointers = Decoder.process_pointers_3_bytes(table_pointers, base, endianness)
+                    pointers_length = 3
+                
+                elif self.main_window.radio_4_bytes.isChecked():                
+                    format_pointers = Decoder.process_pointers_4_bytes(table_pointers, base, endianness)
+                    pointers_length = 4
+            self.main_window.progress_bar.setValue(10)
 
-        # Decompress Script (if needed)
-        if not use_compression_algorithm:
-            pass
-        else:
+            # ROM data (zero-copy view)
+            rom_data = rom.data
+            self.main_window.progress_bar.setValue(15)
+        
+            # Load char table to RAM
             try:
-                selected_method = self.main_window.compression_method_list.currentIndex()
-                type_index = self.main_window.compression_type_list.currentIndex()
-                # Lempel-Ziv
-                if selected_method == 0:
-                    # LZ77
-                    if type_index == 0:
-                        rom_data, rom_data_size, rom_data_end_offset, original_data_size = Lempel_ziv.decompress_lz77(rom_data, text_start_offset)
-                    # LZSS
-                    elif type_index == 1:
-                        rom_data, rom_data_size, rom_data_end_offset, original_data_size = Lempel_ziv.decompress_lzss(rom_data, text_start_offset)
-                    # LZW
-                    elif type_index == 2:
-                        rom_data, rom_data_size, rom_data_end_offset, original_data_size = Lempel_ziv.decompress_lzw(rom_data, text_start_offset, 12)
-
-                # Golomb Rice
-                elif selected_method == 1:
-                    # 4 BITS
-                    if type_index == 0:
-                        pass
-                    # 5 BITS
-                    elif type_index == 1:
-                        pass
-                text_size = rom_data_size
-                text_end_offset = rom_data_size - 1
-                self.main_window.progress_bar.setValue(60)
+                char_table = Decoder.read_tbl(tbl_file)
+                self.main_window.progress_bar.setValue(20)
             except Exception as e:
-                self.show_error_dialog(f"Decompression error: {e}")
+                self.show_error_dialog(f"{e}")
                 print("Error: Extraction aborted!")
                 self.main_window.progress_bar.setValue(0)
                 return
+
+            # Decompress Script (if needed)
+            if not use_compression_algorithm:
+                pass
+            else:
+                try:
+                    selected_method = self.main_window.compression_method_list.currentIndex()
+                    type_index = self.main_window.compression_type_list.currentIndex()
+                    # Lempel-Ziv
+                    if selected_method == 0:
+                        # LZ77
+                        if type_index == 0:
+                            rom_data, rom_data_size, rom_data_end_offset, original_data_size = Lempel_ziv.decompress_lz77(rom_data, text_start_offset)
+                        # LZSS
+                        elif type_index == 1:
+                            rom_data, rom_data_size, rom_data_end_offset, original_data_size = Lempel_ziv.decompress_lzss(rom_data, text_start_offset)
+                        # LZW
+                        elif type_index == 2:
+                            rom_data, rom_data_size, rom_data_end_offset, original_data_size = Lempel_ziv.decompress_lzw(rom_data, text_start_offset, 12)
+
+                    # Golomb Rice
+                    elif selected_method == 1:
+                        # 4 BITS
+                        if type_index == 0:
+                            pass
+                        # 5 BITS
+                        elif type_index == 1:
+                            pass
+                    text_size = rom_data_size
+                    text_end_offset = rom_data_size - 1
+                    self.main_window.progress_bar.setValue(60)
+                except Exception as e:
+                    self.show_error_dialog(f"Decompression error: {e}")
+                    print("Error: Extraction aborted!")
+                    self.main_window.progress_bar.setValue(0)
+                    return
                               
-        # Decode Script
-        try:
+            # Decode Script (lines are written while they are decoded)
             if no_use_end_lines_for_split:
-                script, total_bytes_read, lines_length = Decoder.decode_script_no_end_line(
+                end_line = None
+                records = Decoder.iter_decode_script_no_end_line(
                     rom_data, format_pointers, text_end_offset + 1, char_table, bracket_index
                 )
             else:
@@ -350,43 +362,48 @@ class Functions:
                     self.main_window.progress_bar.setValue(0)
                     return
 
-                script, total_bytes_read, lines_length = Decoder.decode_script(
-                    rom_data, format_pointers, end_line, char_table, bracket_index
-                )
+                # Parallel decoding maps the ROM file, so it only works on uncompressed text
+                if jobs > 1 and not use_compression_algorithm:
+                    records = Decoder.iter_decode_script_parallel(
+                        rom_file, format_pointers, end_line, char_table, bracket_index, jobs
+                    )
+                else:
+                    records = Decoder.iter_decode_script(
+                        rom_data, format_pointers, end_line, char_table, bracket_index
+                    )
+
+            self.main_window.progress_bar.setValue(80)
+        
+            # Write Script
+            if use_compression_algorithm and rom_data_size != 0:
+                print(f"COMPRESSED SIZE: {original_data_size} / 0x{original_data_size:X} bytes.")
+                print(f"DECOMPRESSED SIZE: {rom_data_size} / 0x{rom_data_size:X} bytes.")
+                ratio = abs(original_data_size - rom_data_size) / rom_data_size
+                print(f"RATIO: {ratio}, FINAL OFFSET: 0x{rom_data_end_offset:X}")
+            try:
+                if use_split_pointers_method:
+                    _, shared_pointers = Decoder.write_out_stream(out_file, records, lsb_ptr_offset, msb_ptr_offset + split_ptr_size - 1, split_ptr_size, end_line, no_comments_lines)
+                else:
+                    _, shared_pointers = Decoder.write_out_stream(out_file, records, pointers_start_offset, pointers_start_offset + pointers_size - 1, pointers_size, end_line, no_comments_lines)
+            except IndexError:
+                self.show_error_dialog("Pointers out of ROM size.")
+                self.main_window.progress_bar.setValue(0)
+                return
 
-        except IndexError:
-            self.show_error_dialog("Pointers out of ROM size.")
+            if use_split_pointers_method:
+                print(f"TEXT BLOCK SIZE: {text_size} / 0x{text_size:X} bytes.")
+                print(f"PTR_TABLE BLOCK SIZE: {split_ptr_size * 2} / 0x{split_ptr_size * 2:X} bytes. {split_ptr_size} pointers found.")
+            else:
+                print(f"TEXT BLOCK SIZE: {text_size} / 0x{text_size:X} bytes.")
+                print(f"PTR_TABLE BLOCK SIZE: {pointers_size} / 0x{pointers_size:X} bytes. {pointers_size // pointers_length} pointers found.")
+            if shared_pointers:
+                print(f"SHARED POINTERS: {shared_pointers} pointers reuse a previous line.")
+            self.main_window.progress_bar.setValue(100)
+            self.show_success_dialog("Script extracted successfully!")
+            print("Script extracted successfully!")
             self.main_window.progress_bar.setValue(0)
-            return
-
-        self.main_window.progress_bar.setValue(80)
-        
-        # Write Script
-        if use_compression_algorithm and rom_data_size != 0:
-            print(f"COMPRESSED SIZE: {original_data_size} / 0x{original_data_size:X} bytes.")
-            print(f"DECOMPRESSED SIZE: {rom_data_size} / 0x{rom_data_size:X} bytes.")
-            ratio = abs(original_data_size - rom_data_size) / rom_data_size
-            print(f"RATIO: {ratio}, FINAL OFFSET: 0x{rom_data_end_offset:X}")
-        if use_split_pointers_method and no_use_end_lines_for_split:
-            decode_script = Decoder.write_out_file(out_file, script, lsb_ptr_offset, msb_ptr_offset + split_ptr_size - 1, split_ptr_size, format_pointers, lines_length, None, no_comments_lines)
-            print(f"TEXT BLOCK SIZE: {text_size} / 0x{text_size:X} bytes.")
-            print(f"PTR_TABLE BLOCK SIZE: {split_ptr_size * 2} / 0x{split_ptr_size * 2:X} bytes. {split_ptr_size} pointers found.")
-        elif use_split_pointers_method:
-            decode_script = Decoder.write_out_file(out_file, script, lsb_ptr_offset, msb_ptr_offset + split_ptr_size - 1, split_ptr_size, format_pointers, lines_length, end_line, no_comments_lines)
-            print(f"TEXT BLOCK SIZE: {text_size} / 0x{text_size:X} bytes.")
-            print(f"PTR_TABLE BLOCK SIZE: {split_ptr_size * 2} / 0x{split_ptr_size * 2:X} bytes. {split_ptr_size} pointers found.")
-        elif no_use_end_lines_for_split:
-            decode_script = Decoder.write_out_file(out_file, script, pointers_start_offset, pointers_start_offset + pointers_size - 1, pointers_size, format_pointers, lines_length, None, no_comments_lines)
-            print(f"TEXT BLOCK SIZE: {text_size} / 0x{text_size:X} bytes.")
-            print(f"PTR_TABLE BLOCK SIZE: {pointers_size} / 0x{pointers_size:X} bytes. {pointers_size // pointers_length} pointers found.")
-        else:
-            decode_script = Decoder.write_out_file(out_file, script, pointers_start_offset, pointers_start_offset + pointers_size - 1, pointers_size, format_pointers, lines_length, end_line, no_comments_lines)
-            print(f"TEXT BLOCK SIZE: {text_size} / 0x{text_size:X} bytes.")
-            print(f"PTR_TABLE BLOCK SIZE: {pointers_size} / 0x{pointers_size:X} bytes. {pointers_size // pointers_length} pointers found.")
-        self.main_window.progress_bar.setValue(100)
-        self.show_success_dialog("Script extracted successfully!")
-        print("Script extracted successfully!")
-        self.main_window.progress_bar.setValue(0)
+        finally:
+            rom.close()
             
     def process_insertion(self, rom_file):
         # CONSTANTS OPTIONS
@@ -407,6 +424,7 @@ class Functions:
                 self.main_window.progress_bar.setValue(0)
                 return
         not_use_end_lines = self.main_window.not_use_end_line_checkbox.isChecked()
+        optimal_encoding = self.main_window.optimal_encoding_checkbox.isChecked()
         endianness = self.main_window.endianness_list.currentIndex()
 
         # VARIABLE OPTIONS
@@ -463,9 +481,9 @@ class Functions:
 
         # Encode Text
         if not_use_end_lines:
-            new_script_data, new_script_size, cumulative_lengths = Encoder.encode_script(new_script, None, char_table, longest_char, not_use_end_lines, bracket_index)
+            new_script_data, new_script_size, cumulative_lengths = Encoder.encode_script(new_script, None, char_table, longest_char, not_use_end_lines, bracket_index, optimal_encoding)
         else:
-            new_script_data, new_script_size, cumulative_lengths = Encoder.encode_script(new_script, end_line, char_table, longest_char, not_use_end_lines, bracket_index)
+            new_script_data, new_script_size, cumulative_lengths = Encoder.encode_script(new_script, end_line, char_table, longest_char, not_use_end_lines, bracket_index, optimal_encoding)
         self.main_window.progress_bar.setValue(50)
 
         # Compress Text (If needed)
@@ -476,14 +494,15 @@ class Functions:
             try:
                 selected_method = self.main_window.compression_method_list.currentIndex()
                 type_index = self.main_window.compression_type_list.currentIndex()
+                optimal = self.main_window.compression_optimal_checkbox.isChecked()
                 # Lempel-Ziv
                 if selected_method == 0:
                     # LZ77
                     if type_index == 0:
-                        new_script_data, compressed_new_script_size, decompressed_script_size = Lempel_ziv.compress_lz77(new_script_data)
+                        new_script_data, compressed_new_script_size, decompressed_script_size = Lempel_ziv.compress_lz77(new_script_data, optimal=optimal)
                     # LZSS
                     elif type_index == 1:
-                        new_script_data, compressed_new_script_size, decompressed_script_size = Lempel_ziv.compress_lzss(new_script_data)
+                        new_script_data, compressed_new_script_size, decompressed_script_size = Lempel_ziv.compress_lzss(new_script_data, optimal=optimal)
                     # LZW
                     elif type_index == 2:
                         new_script_data, compressed_new_script_size, decompressed_script_size = Lempel_ziv.compress_lzw(new_script_data, 12)
@@ -506,44 +525,50 @@ class Functions:
                 return
             
         # Format Pointers
-        if self.main_window.use_split_pointers_checkbox.isChecked():
-            original_pointers_start_offset = int(self.main_window.lsb_offset_input.text(), 16)
-            original_pointers_end_offset = int(self.main_window.msb_offset_input.text(), 16)
-            if original_pointers_start_offset > original_pointers_end_offset:
-                self.show_error_dialog("Pointers start offset can't be higher than pointers end offset.")
-                print("Error: Extraction aborted!")
-                self.main_window.progress_bar.setValue(0)
-                return
-            original_pointers_size = int(self.main_window.size_input.text(), 16)
-            new_pointers_data_lsb, new_pointers_data_msb, new_pointers_size = Encoder.calculate_pointers_2_bytes_split(cumulative_lengths, original_text_start_offset, relative_start, base)
-        else:
-            try:
-                original_pointers_start_offset = int(self.main_window.pointers_start_offset_input.text(), 16) 
-                original_pointers_end_offset = int(self.main_window.pointers_end_offset_input.text(), 16)
-            except (ValueError, UnboundLocalError):
-                self.show_error_dialog("Please fill in all required fields.")
-                print("Error: Insertion aborted!")
-                self.main_window.progress_bar.setValue(0)
-                return    
-            if original_pointers_end_offset < original_pointers_start_offset:
-                self.show_error_dialog(f"Error invalid offsets!")
-                print("Error: Insertion aborted!")
-                self.main_window.progress_bar.setValue(0)
-                return
-            original_pointers_size = original_pointers_end_offset - original_pointers_start_offset + 1
-            if self.main_window.radio_2_bytes.isChecked():
-                new_pointers_data, new_pointers_size = Encoder.calculate_pointers_2_bytes(cumulative_lengths, original_text_start_offset, relative_start, base, endianness)
-                pointers_length = 2
-                
-            elif self.main_window.radio_3_bytes.isChecked():
-                new_pointers_data, new_pointers_size = Encoder.calculate_pointers_3_bytes(cumulative_lengths, original_text_start_offset, relative_start, base, endianness)
-                pointers_length = 3
+        try:
+            if self.main_window.use_split_pointers_checkbox.isChecked():
+                original_pointers_start_offset = int(self.main_window.lsb_offset_input.text(), 16)
+                original_pointers_end_offset = int(self.main_window.msb_offset_input.text(), 16)
+                if original_pointers_start_offset > original_pointers_end_offset:
+                    self.show_error_dialog("Pointers start offset can't be higher than pointers end offset.")
+                    print("Error: Extraction aborted!")
+                    self.main_window.progress_bar.setValue(0)
+                    return
+                original_pointers_size = int(self.main_window.size_input.text(), 16)
+                new_pointers_data_lsb, new_pointers_data_msb, new_pointers_size = Encoder.calculate_pointers_2_bytes_split(cumulative_lengths, original_text_start_offset, relative_start, base)
+            else:
+                try:
+                    original_pointers_start_offset = int(self.main_window.pointers_start_offset_input.text(), 16) 
+                    original_pointers_end_offset = int(self.main_window.pointers_end_offset_input.text(), 16)
+                except (ValueError, UnboundLocalError):
+                    self.show_error_dialog("Please fill in all required fields.")
+                    print("Error: Insertion aborted!")
+                    self.main_window.progress_bar.setValue(0)
+                    return    
+                if original_pointers_end_offset < original_pointers_start_offset:
+                    self.show_error_dialog(f"Error invalid offsets!")
+                    print("Error: Insertion aborted!")
+                    self.main_window.progress_bar.setValue(0)
+                    return
+                original_pointers_size = original_pointers_end_offset - original_pointers_start_offset + 1
+                if self.main_window.radio_2_bytes.isChecked():
+                    new_pointers_data, new_pointers_size = Encoder.calculate_pointers_2_bytes(cumulative_lengths, original_text_start_offset, relative_start, base, endianness)
+                    pointers_length = 2
                 
-            elif self.main_window.radio_4_bytes.isChecked():                
-                new_pointers_data, new_pointers_size = Encoder.calculate_pointers_4_bytes(cumulative_lengths, original_text_start_offset, relative_start, base, endianness)
-                pointers_length = 4
-            self.main_window.progress_bar.setValue(90)
+                elif self.main_window.radio_3_bytes.isChecked():
+                    new_pointers_data, new_pointers_size = Encoder.calculate_pointers_3_bytes(cumulative_lengths, original_text_start_offset, relative_start, base, endianness)
+                    pointers_length = 3
                 
+                elif self.main_window.radio_4_bytes.isChecked():                
+                    new_pointers_data, new_pointers_size = Encoder.calculate_pointers_4_bytes(cumulative_lengths, original_text_start_offset, relative_start, base, endianness)
+                    pointers_length = 4
+                self.main_window.progress_bar.setValue(90)
+        except ValueError as e:
+            self.show_error_dialog(f"{e}")
+            print("Error: Insertion aborted!")
+            self.main_window.progress_bar.setValue(0)
+            return
+
         # Write ROM
         if new_script_size > original_text_size:
             self.main_window.progress_bar.setValue(100)
@@ -561,23 +586,26 @@ class Functions:
             print(f"COMPRESSED SIZE: {compressed_new_script_size} / 0x{compressed_new_script_size:X} bytes.")
             print(f"DECOMPRESSED SIZE: {decompressed_script_size} / 0x{decompressed_script_size:X} bytes.")
             print(f"RATIO: {abs(compressed_new_script_size - decompressed_script_size) / decompressed_script_size}")
+        # Collect the writes, then apply them at once
         try:
-            free_space_script = Encoder.write_rom(rom_file, original_text_start_offset, original_text_size, new_script_data, fill_free_space, fill_free_space_byte)
-            print(f"Script written at address 0x{original_text_start_offset:X}, {free_space_script} bytes of free space.")
+            rom_patch = RomPatch(rom_file)
+            free_space_script = Encoder.write_rom(rom_patch, original_text_start_offset, original_text_size, new_script_data, fill_free_space, fill_free_space_byte)
+            if not self.main_window.use_split_pointers_checkbox.isChecked():
+                free_space_pointers = Encoder.write_rom(rom_patch, original_pointers_start_offset, original_pointers_size, new_pointers_data, False, fill_free_space_byte)
+                free_pointers = free_space_pointers // pointers_length
+            else:
+                free_space_pointers = Encoder.write_rom(rom_patch, original_pointers_start_offset, original_pointers_size, new_pointers_data_lsb, False, fill_free_space_byte)
+                free_space_pointers = Encoder.write_rom(rom_patch, original_pointers_end_offset, original_pointers_size, new_pointers_data_msb, False, fill_free_space_byte)
+                free_pointers = free_space_pointers // 2
+            bytes_written = rom_patch.commit()
         except Exception as e:
             self.show_error_dialog(f"{e}")
             print("Error: Insertion aborted!")
             self.main_window.progress_bar.setValue(0)
             return
-            
-        if not self.main_window.use_split_pointers_checkbox.isChecked():
-            free_space_pointers = Encoder.write_rom(rom_file, original_pointers_start_offset, original_pointers_size, new_pointers_data, False, fill_free_space_byte)
-            print(f"Pointers table written at address 0x{original_pointers_start_offset:X}, {free_space_pointers // pointers_length} lines/pointers left.")
-
-        else:
-            free_space_pointers = Encoder.write_rom(rom_file, original_pointers_start_offset, original_pointers_size, new_pointers_data_lsb, False, fill_free_space_byte)
-            free_space_pointers = Encoder.write_rom(rom_file, original_pointers_end_offset, original_pointers_size, new_pointers_data_msb, False, fill_free_space_byte)
-            print(f"Pointers table written at address 0x{original_pointers_start_offset:X}, {free_space_pointers // 2} lines/pointers left.")
+        print(f"Script written at address 0x{original_text_start_offset:X}, {free_space_script} bytes of free space.")
+        print(f"Pointers table written at address 0x{original_pointers_start_offset:X}, {free_pointers} lines/pointers left.")
+        print(f"ROM UPDATED: {bytes_written} bytes written.")
 
         self.main_window.progress_bar.setValue(100)
         self.show_success_dialog("Script inserted successfully!")
@@ -692,7 +720,9 @@ class FileHandler:
 
                     # Advanced Options Config
                     self.main_window.use_custom_brackets_for_hex_codes_list.setCurrentIndex(config_data.get("brackets", ""))
+                    self.main_window.jobs_input.setText(str(config_data.get("jobs", "1")))
                     self.main_window.not_comment_lines_checkbox.setChecked(config_data.get("no_use_comments_lines", False)) 
+                    self.main_window.optimal_encoding_checkbox.setChecked(config_data.get("optimal_encoding", False))
                     self.main_window.fill_free_space_byte_checkbox.setChecked(config_data.get("fill_free_space", False))
                     self.main_window.use_split_pointers_checkbox.setChecked(config_data.get("use_split_pointers", False))
                     self.main_window.not_use_end_line_checkbox.setChecked(config_data.get("not_use_end_line", False))
@@ -701,6 +731,7 @@ class FileHandler:
                     self.main_window.use_compression_algorithm_method_checkbox.setChecked(config_data.get("use_compression_method", False)) 
                     self.main_window.compression_method_list.setCurrentIndex(config_data.get("compression_algorithm", 0))
                     self.main_window.compression_type_list.setCurrentIndex(config_data.get("compression_variant", 0))
+                    self.main_window.compression_optimal_checkbox.setChecked(config_data.get("compression_optimal", False))
 
                     # Analysis Tools Config
                     self.main_window.compare_to_dictionary_list.setCurrentIndex(config_data.get("compare_to_dictionary", 0))
@@ -817,7 +848,11 @@ class FileHandler:
 
                 # Advanced Options Configs
                 config_data["no_use_comments_lines"] = self.main_window.not_comment_lines_checkbox.isChecked()
+                config_data["optimal_encoding"] = self.main_window.optimal_encoding_checkbox.isChecked()
                 config_data["brackets"] = self.main_window.use_custom_brackets_for_hex_codes_list.currentIndex()
+                jobs = self.main_window.jobs_input.text().strip()
+                if jobs:
+                    config_data["jobs"] = jobs
                 config_data["fill_free_space"] = self.main_window.fill_free_space_byte_checkbox.isChecked()           
                 config_data["use_split_pointers"] = self.main_window.use_split_pointers_checkbox.isChecked()
                 config_data["not_use_end_line"] = self.main_window.not_use_end_line_checkbox.isChecked()
@@ -827,6 +862,7 @@ class FileHandler:
                 config_data["use_compression_method"] = self.main_window.use_compression_algorithm_method_checkbox.isChecked()
                 config_data["compression_algorithm"] = self.main_window.compression_method_list.currentIndex()
                 config_data["compression_variant"] = self.main_window.compression_type_list.currentIndex()
+                config_data["compression_optimal"] = self.main_window.compression_optimal_checkbox.isChecked()
 
                 # Analysis tools configs
 
@@ -1148,7 +1184,7 @@ class MyWindow(QMainWindow):
 
     def create_compression_tools_groupbox(self):
         group_box = QGroupBox()
-        group_box.setMaximumHeight(140)
+        group_box.setMaximumHeight(165)
         layout = QVBoxLayout()
 
         # Use compression/decompression tools
@@ -1180,6 +1216,11 @@ class MyWindow(QMainWindow):
         type_layout.addStretch()
         layout.addLayout(type_layout)
 
+        # Optimal parsing (LZ77 and LZSS)
+        self.compression_optimal_checkbox = QCheckBox("Optimal parsing, smaller output but slower (LZ77 and LZSS).", self)
+        self.compression_optimal_checkbox.setDisabled(True)
+        layout.addWidget(self.compression_optimal_checkbox)
+
         # Connect with function
         self.compression_method_list.currentIndexChanged.connect(
             lambda index: Functions.update_compression_types(index, self.compression_type_list)
@@ -1410,10 +1451,21 @@ class MyWindow(QMainWindow):
         self.use_custom_brackets_for_hex_codes_list.addItem("< >", 3)
         self.use_custom_brackets_for_hex_codes_list.setCurrentIndex(0)
         
+        # Worker processes for extraction
+        self.jobs_label = QLabel("   Jobs:", self)
+        self.jobs_label.setToolTip("Number of processes used to decode the script at 'extract'.\nOnly used with end line codes and without compression.")
+        self.jobs_input = QLineEdit(self)
+        self.jobs_input.setText("1")
+        self.jobs_input.setFixedWidth(25)
+        self.jobs_input.setValidator(QRegExpValidator(QRegExp("[1-9][0-9]?")))
+        self.jobs_input.setToolTip("Number of processes used to decode the script at 'extract'.\nOnly used with end line codes and without compression.")
+
         use_custom_brackets = QHBoxLayout()
         use_custom_brackets.setContentsMargins(0, 0, 0, 0)
         use_custom_brackets.addWidget(self.use_custom_brackets_for_hex_codes_label)
         use_custom_brackets.addWidget(self.use_custom_brackets_for_hex_codes_list)
+        use_custom_brackets.addWidget(self.jobs_label)
+        use_custom_brackets.addWidget(self.jobs_input)
         use_custom_brackets.addStretch()                                          
         
         use_custom_brackets_widget = QWidget(self)
@@ -1424,7 +1476,22 @@ class MyWindow(QMainWindow):
         # Not comment lines 
         self.not_comment_lines_checkbox = QCheckBox("Don't comment lines.", self)
         self.not_comment_lines_checkbox.setToolTip("Use this if you don't want a duplicate line as a comment.\n"'Note: comments will start with ";".') 
-        advanced_layout.addWidget(self.not_comment_lines_checkbox)
+
+        # Optimal encoding
+        self.optimal_encoding_checkbox = QCheckBox("Optimal encoding.", self)
+        self.optimal_encoding_checkbox.setToolTip("Use this to encode with the fewest bytes when DTE/MTE entries overlap.\nSlower than the default longest match. Only when inserted.")
+
+        comment_lines = QHBoxLayout()
+        comment_lines.setSpacing(0)
+        comment_lines.setContentsMargins(0, 0, 0, 0)
+        comment_lines.addWidget(self.not_comment_lines_checkbox)
+        comment_lines.addWidget(self.optimal_encoding_checkbox)
+        comment_lines.addStretch()
+
+        comment_lines_widget = QWidget(self)
+        comment_lines_widget.setLayout(comment_lines)
+
+        advanced_layout.addWidget(comment_lines_widget)
 
         # Fill free space with byte
 
@@ -1604,6 +1671,7 @@ class MyWindow(QMainWindow):
         dialog.exec_()
     
 if __name__ == '__main__':
+    freeze_support()
     if len(sys.argv) > 1:
         print("Use console.exe to use cli commands.")
         exit(1)
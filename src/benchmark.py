@@ -0,0 +1,88 @@
+# Benchmarks for HexString decoding/encoding paths.
+#
+# Builds synthetic ROM data and .tbl tables of different sizes and measures
+# the throughput of the decoder and the load time of the .tbl cache. Only the
+# table benchmark writes files, in a temporary folder.
+#
+# Usage:
+#   python benchmark.py
+
+import os
+import random
+import tempfile
+import time
+from decoder import Decoder
+from table import Table
+
+
+def build_char_table(entries, seed=0):
+    """
+    Builds a random character table with all single bytes plus DTE/MTE entries.
+
+    Parameters:
+        entries (int): Number of entries in the table.
+        seed (int): Random seed.
+
+    Returns:
+        dict: A dictionary mapping byte sequences (bytes) to strings.
+    """
+    rng = random.Random(seed)
+    char_table = {bytes([i]): chr(0x20 + i % 0x5F) for i in range(256)}
+    while len(char_table) < entries:
+        key = bytes(rng.randrange(256) for _ in range(rng.randint(2, 4)))
+        char_table[key] = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(len(key)))
+    # Smaller tables keep only part of the single bytes
+    if entries < 256:
+        char_table = dict(list(char_table.items())[:entries])
+    return char_table
+
+
+def bench_decode_no_end_line(rom_size=0x40000, lines=4000, sizes=(100, 1000, 10000)):
+    """
+    Prints decode_script_no_end_line throughput for different table sizes.
+    """
+    rng = random.Random(1)
+    rom_data = bytes(rng.randrange(256) for _ in range(rom_size))
+    addresses = sorted(rng.sample(range(rom_size), lines))
+
+    print("decode_script_no_end_line")
+    for size in sizes:
+        char_table = build_char_table(size)
+        start = time.perf_counter()
+        Decoder.decode_script_no_end_line(rom_data, list(addresses), rom_size, char_table, 0)
+        elapsed = time.perf_counter() - start
+        decoded = rom_size - addresses[0]
+        print(f"  {size:>6} entries: {decoded / elapsed:>12,.0f} bytes/s ({elapsed:.3f} s)")
+
+
+def bench_table_load(sizes=(1000, 20000), runs=5):
+    """
+    Prints the time to parse a .tbl file against the time to load it from its cache.
+    """
+    print("Table.load")
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            tbl_file = os.path.join(folder, f"{size}.tbl")
+            with open(tbl_file, "w", encoding="UTF-8") as f:
+                for byte_key, chars in build_char_table(size).items():
+                    f.write(f"{byte_key.hex().upper()}={chars}\n")
+            with open(tbl_file, "rb") as f:
+                raw = f.read()
+
+            parse_time = cached_time = float("inf")
+            for _ in range(runs):
+                start = time.perf_counter()
+                codes, chars, _ = Table.parse(raw)
+                Table.build(codes, chars)
+                parse_time = min(parse_time, time.perf_counter() - start)
+
+                Table.load(tbl_file)
+                start = time.perf_counter()
+                Table.load(tbl_file)
+                cached_time = min(cached_time, time.perf_counter() - start)
+            print(f"  {size:>6} entries: parse {parse_time:.4f} s, cached {cached_time:.4f} s ({parse_time / cached_time:.1f}x)")
+
+
+if __name__ == '__main__':
+    bench_decode_no_end_line()
+    bench_table_load()
@@ -20,7 +20,11 @@ copy console.spec dist\src\
 copy decoder.py dist\src\
 copy encoder.py dist\src\
 copy hexstring.spec dist\src\
+copy insert_cache.py dist\src\
 copy lempel_ziv.py dist\src\
+copy patch.py dist\src\
+copy rom.py dist\src\
+copy table.py dist\src\
 copy requirements.txt dist\
 copy LICENSE dist\
 copy ASCII.tbl dist\
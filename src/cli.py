@@ -5,6 +5,10 @@ import json
 from config import app_name, version, author, license, date, hour
 from decoder import Decoder
 from encoder import Encoder
+from rom import Rom, RomPatch
+from insert_cache import InsertCache
+from patch import Patch
+from concurrent.futures import ProcessPoolExecutor
 
 class CustomArgumentParser(argparse.ArgumentParser):
     def error(self, message):
@@ -64,6 +68,7 @@ class CLI:
         print("|   insert            Insert script into ROM")
         print("|   extractconfig     Extract script using .json config.")
         print("|   insertconfig      Insert script using .json config.")
+        print("|   extractproject    Extract many scripts using a .json project.")
         print("|   -v                Show build version.")
         print("|   -help -?          Show this message.")
         print("+----------------------------------------------------------------------------------")
@@ -83,6 +88,12 @@ class CLI:
         print("|  --fill <hex_value>                       Fill value in hex (optional).")
         print("|  --use-split-pointers <lsb> <msb> <size>  Split pointers method (optional).")
         print("|  --no-use-end-lines  <hex_value>          Do not use end lines (optional).")
+        print("|  --jobs <number>                          Worker processes for extraction/insertion (optional).")
+        print("|  --optimal                                Minimum-byte DTE/MTE encoding (optional).")
+        print("|  --incremental                            Re-encode and write only changed lines (optional).")
+        print("|  --atomic                                 Patch a copy, then replace the ROM (optional).")
+        print("|  --patch <path>                           Write an .ips/.bps patch, the ROM is not modified (optional).")
+        print("|  --pool <1|2>                             Share identical (1) and suffix (2) strings (optional).")
         print("+----------------------------------------------------------------------------------")
         sys.exit(1)
 
@@ -104,13 +115,24 @@ class CLI:
             print(f"\nERROR: Config version {json_version} is lower than required 1.4.0")
             sys.exit(1)
             
+        CLI.validate_config(config, "config")
+        argv = CLI.config_to_argv(config, config_dir, config_file)
+
+        # Save Parser
+        parser = self.setup_parser()
+        self.args = parser.parse_args(argv)
+
+    @staticmethod
+    def validate_config(config, config_name):
         # Validate required fields
         required_fields = ["rom_file", "tbl_file", "script_file", "pointers_base", "text_start_offset", "text_end_offset"]
         for field in required_fields:
             if field not in config or not config[field]:
-                print(f"\nERROR: Missing or empty required field '{field}' in config.")
+                print(f"\nERROR: Missing or empty required field '{field}' in {config_name}.")
                 sys.exit(1)
 
+    @staticmethod
+    def config_to_argv(config, config_dir, config_file):
         # Build parser
         argv = ["extract"]
 
@@ -156,6 +178,8 @@ class CLI:
                 sys.exit(1)
             
         # Get Advanced Options 
+        if config.get("jobs"):
+            argv += ["--jobs", str(config["jobs"])]
         if config.get("not_use_end_line") is True:
             text_end = config.get("text_end_offset")
             argv.extend(['--no-use-end-lines', text_end])
@@ -165,10 +189,7 @@ class CLI:
             else:
                 print(f'\nERROR: Missing "end_line" value in "{config_file}" and option "not_use_end_line = False".')
                 sys.exit(1)
-            
-        # Save Parser
-        parser = self.setup_parser()
-        self.args = parser.parse_args(argv)
+        return argv
 
     def handle_insert_config(self):
         config_file = self.args.config
@@ -248,6 +269,18 @@ class CLI:
         if config.get("fill_free_space") is True:
             fill_val = config.get("fill_free_space_byte")
             argv.extend(["--fill", fill_val])
+        if config.get("optimal_encoding") is True:
+            argv.append("--optimal")
+        if config.get("incremental_insert") is True:
+            argv.append("--incremental")
+        if config.get("atomic_write") is True:
+            argv.append("--atomic")
+        if config.get("jobs"):
+            argv += ["--jobs", str(config["jobs"])]
+        if config.get("string_pooling"):
+            argv += ["--pool", str(config["string_pooling"])]
+        if config.get("patch_file"):
+            argv += ["--patch", os.path.join(config_dir, config["patch_file"])]
 
         # Save Parser
         parser = self.setup_parser()
@@ -279,7 +312,7 @@ class CLI:
         if self.args.use_custom_brackets is not None:
             print(f"|   Bracket Type: {self.args.use_custom_brackets}")
         print("+----------------------------------------------------------------------------------")
-        if self.args.no_comments or self.args.use_split_pointers is not None or self.args.no_use_end_lines:
+        if self.args.no_comments or self.args.use_split_pointers is not None or self.args.no_use_end_lines or self.args.jobs > 1:
             print("| Advanced Options:")
             if self.args.no_comments:
                 print("|   Comments disabled.")       
@@ -287,84 +320,157 @@ class CLI:
                 print(f"|   Use split pointers method.")      
             if self.args.no_use_end_lines:
                 print("|   Don't use end lines.")
+            if self.args.jobs > 1:
+                print(f"|   Jobs: {self.args.jobs}")
             print("+----------------------------------------------------------------------------------")
 
+        # Map ROM file and load char table to RAM
+        rom = Rom(self.args.rom)
+        char_table = Decoder.read_tbl(self.args.tbl)
+
+        for line in CLI.extract_script(self.args, rom, char_table):
+            print(line)
+        rom.close()
+        print("|   Extraction Done!")
+        print("+----------------------------------------------------------------------------------")
+
+    @staticmethod
+    def extract_script(args, rom, char_table):
+        # Extracts one script from a mapped ROM, returns the report lines
+
         # Get Options
+        rom_file = args.rom
+        out_file = args.file
+        base = args.base
+        no_comments_lines = args.no_comments
+        report = []
 
-        rom_file = self.args.rom
-        tbl_file = self.args.tbl
-        out_file = self.args.file
-        base = self.args.base
-        no_comments_lines = self.args.no_comments
-        
         # Get Pointers
-        if self.args.use_split_pointers is not None:
-            lsb_ptr_offset, msb_ptr_offset, split_ptr_size = self.args.use_split_pointers
-            lsb = Decoder.read_rom(rom_file, lsb_ptr_offset, split_ptr_size)
-            msb = Decoder.read_rom(rom_file, msb_ptr_offset, split_ptr_size)
+        if args.use_split_pointers is not None:
+            lsb_ptr_offset, msb_ptr_offset, split_ptr_size = args.use_split_pointers
+            lsb = rom.read(lsb_ptr_offset, split_ptr_size)
+            msb = rom.read(msb_ptr_offset, split_ptr_size)
             format_pointers = Decoder.process_pointers_split_2_bytes(lsb, msb, base)
         else:
-            pointers_start_offset = self.args.pointers_offset
-            pointers_size = self.args.pointers_size
-            table_pointers = Decoder.read_rom(rom_file, pointers_start_offset, pointers_size)
-            if self.args.p == '2b':
+            pointers_start_offset = args.pointers_offset
+            pointers_size = args.pointers_size
+            table_pointers = rom.read(pointers_start_offset, pointers_size)
+            if args.p == '2b':
                 format_pointers = Decoder.process_pointers_2_bytes(table_pointers, base, 0)
                 pointers_length = 2
-            elif self.args.p == '2bb':
+            elif args.p == '2bb':
                 format_pointers = Decoder.process_pointers_2_bytes(table_pointers, base, 1)
                 pointers_length = 2
-            elif self.args.p == '3b':
+            elif args.p == '3b':
                 format_pointers = Decoder.process_pointers_3_bytes(table_pointers, base, 0)
                 pointers_length = 3
-            elif self.args.p == '3bb':
+            elif args.p == '3bb':
                 format_pointers = Decoder.process_pointers_3_bytes(table_pointers, base, 1)
                 pointers_length = 3
-            elif self.args.p == '4b':
+            elif args.p == '4b':
                 format_pointers = Decoder.process_pointers_4_bytes(table_pointers, base, 0)
                 pointers_length = 4
-            elif self.args.p == '4bb':
+            elif args.p == '4bb':
                 format_pointers = Decoder.process_pointers_4_bytes(table_pointers, base, 1)
                 pointers_length = 4
             else:
                 print("\nError: Invalid pointers format!")
                 sys.exit(1)
 
-        # Load ROM data to RAM
-        rom_data = Decoder.read_rom(rom_file, 0, os.path.getsize(rom_file))
+        # ROM data (zero-copy view)
+        rom_data = rom.data
 
         # Check brackets
-        bracket_index = self.args.use_custom_brackets
-
-        # Load char table to RAM
-        char_table = Decoder.read_tbl(tbl_file)
+        bracket_index = args.use_custom_brackets
 
-        # Decode Script
-        if self.args.no_use_end_lines:
-            script, total_bytes_read, lines_length = Decoder.decode_script_no_end_line(rom_data, format_pointers, self.args.no_use_end_lines + 1, char_table, bracket_index)
+        # Decode Script (lines are written while they are decoded)
+        if args.no_use_end_lines:
+            end_line = None
+            records = Decoder.iter_decode_script_no_end_line(rom_data, format_pointers, args.no_use_end_lines + 1, char_table, bracket_index)
         else:
-            end_line = Decoder.parse_end_lines(self.args.end_line)       
-            script, total_bytes_read, lines_length = Decoder.decode_script(rom_data, format_pointers, end_line, char_table, bracket_index)
+            end_line = Decoder.parse_end_lines(args.end_line)       
+            if args.jobs > 1:
+                records = Decoder.iter_decode_script_parallel(rom_file, format_pointers, end_line, char_table, bracket_index, args.jobs)
+            else:
+                records = Decoder.iter_decode_script(rom_data, format_pointers, end_line, char_table, bracket_index)
 
         # Write Script
-        if self.args.use_split_pointers and self.args.no_use_end_lines:
-            decode_script = Decoder.write_out_file(out_file, script, lsb_ptr_offset, msb_ptr_offset + split_ptr_size - 1, split_ptr_size, format_pointers, lines_length, None, no_comments_lines)
-            print(f"|   Script Size: {total_bytes_read} / 0x{total_bytes_read:X} bytes.")
-            print(f"|   Pointers Table Size: {split_ptr_size * 2} / 0x{split_ptr_size * 2:X} bytes. {split_ptr_size} pointers found.")
-        elif self.args.use_split_pointers:
-            decode_script = Decoder.write_out_file(out_file, script, lsb_ptr_offset, msb_ptr_offset + split_ptr_size - 1, split_ptr_size, format_pointers, lines_length, end_line, no_comments_lines)
-            print(f"|   Script Size: {total_bytes_read} / 0x{total_bytes_read:X} bytes.")
-            print(f"|   Pointers Table Size: {split_ptr_size * 2} / 0x{split_ptr_size * 2:X} bytes. {split_ptr_size} pointers found.")
-        elif self.args.no_use_end_lines:
-            decode_script = Decoder.write_out_file(out_file, script, pointers_start_offset, pointers_start_offset + pointers_size - 1, pointers_size, format_pointers, lines_length, None, no_comments_lines)
-            print(f"|   Script Size: {total_bytes_read} / 0x{total_bytes_read:X} bytes.")
-            print(f"|   Pointers Table Size: {pointers_size} / 0x{pointers_size:X} bytes. {pointers_size//pointers_length} pointers found.")
+        if args.use_split_pointers:
+            total_bytes_read, shared_pointers = Decoder.write_out_stream(out_file, records, lsb_ptr_offset, msb_ptr_offset + split_ptr_size - 1, split_ptr_size, end_line, no_comments_lines)
+            report.append(f"|   Script Size: {total_bytes_read} / 0x{total_bytes_read:X} bytes.")
+            report.append(f"|   Pointers Table Size: {split_ptr_size * 2} / 0x{split_ptr_size * 2:X} bytes. {split_ptr_size} pointers found.")
+        else:
+            total_bytes_read, shared_pointers = Decoder.write_out_stream(out_file, records, pointers_start_offset, pointers_start_offset + pointers_size - 1, pointers_size, end_line, no_comments_lines)
+            report.append(f"|   Script Size: {total_bytes_read} / 0x{total_bytes_read:X} bytes.")
+            report.append(f"|   Pointers Table Size: {pointers_size} / 0x{pointers_size:X} bytes. {pointers_size//pointers_length} pointers found.")
+        if shared_pointers:
+            report.append(f"|   Shared Pointers: {shared_pointers} pointers reuse a previous line.")
+        return report
+
+    def handle_extract_project(self):
+        project_file = self.args.project
+        if not os.path.exists(project_file):
+            print(f"\nERROR: Project file '{project_file}' not found.")
+            sys.exit(1)
+
+        # Get the directory of the project file
+        project_dir = os.path.dirname(os.path.abspath(project_file))
+
+        with open(project_file, "r", encoding="utf-8") as f:
+            project = json.load(f)
+
+        # Validate project
+        json_version = project.get("version", "0.0.0")
+        if tuple(map(int, json_version.split("."))) < (1, 4, 0):
+            print(f"\nERROR: Project version {json_version} is lower than required 1.4.0")
+            sys.exit(1)
+        blocks = project.get("blocks")
+        if not blocks:
+            print(f"\nERROR: Missing or empty \"blocks\" list in '{project_file}'.")
+            sys.exit(1)
+        jobs = int(project.get("jobs", 1))
+
+        # Every block is a config, top level fields are shared by all of them
+        shared = {key: value for key, value in project.items() if key not in ("blocks", "jobs")}
+        parser = self.setup_parser()
+        blocks_args = []
+        for block in blocks:
+            config = dict(shared)
+            config.update(block)
+            CLI.validate_config(config, f"block {len(blocks_args) + 1}")
+            args = parser.parse_args(CLI.config_to_argv(config, project_dir, project_file))
+            # Blocks already run in parallel, don't nest worker pools
+            if jobs > 1:
+                args.jobs = 1
+            blocks_args.append(args)
+
+        print("+----------------------------------------------------------------------------------")
+        print(f"| {app_name} v{version} by {author}")
+        print("+----------------------------------------------------------------------------------")
+        print("| Summary:")
+        print(f"|   Project File: {project_file}")
+        print(f"|   Blocks: {len(blocks_args)}")
+        if jobs > 1:
+            print(f"|   Jobs: {jobs}")
+        print("+----------------------------------------------------------------------------------")
+
+        # ROM files and tables are loaded once per process
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                reports = pool.map(extract_project_block, blocks_args)
+                CLI.print_project_reports(blocks_args, reports)
         else:
-            decode_script = Decoder.write_out_file(out_file, script, pointers_start_offset, pointers_start_offset + pointers_size - 1, pointers_size, format_pointers, lines_length, end_line, no_comments_lines)
-            print(f"|   Script Size: {total_bytes_read} / 0x{total_bytes_read:X} bytes.")
-            print(f"|   Pointers Table Size: {pointers_size} / 0x{pointers_size:X} bytes. {pointers_size//pointers_length} pointers found.")
+            CLI.print_project_reports(blocks_args, map(extract_project_block, blocks_args))
+            close_project_worker()
         print("|   Extraction Done!")
         print("+----------------------------------------------------------------------------------")
 
+    @staticmethod
+    def print_project_reports(blocks_args, reports):
+        for i, (args, report) in enumerate(zip(blocks_args, reports), 1):
+            print(f"| Block {i}: {args.file}")
+            for line in report:
+                print(line)
 
     def handle_insert(self):
         print("+----------------------------------------------------------------------------------")
@@ -391,7 +497,7 @@ class CLI:
         if self.args.use_custom_brackets is not None:
             print(f"|   Bracket Type: {self.args.use_custom_brackets}")
         print("+----------------------------------------------------------------------------------")
-        if self.args.fill is not None or self.args.use_split_pointers is not None or self.args.no_use_end_lines:
+        if self.args.fill is not None or self.args.use_split_pointers is not None or self.args.no_use_end_lines or self.args.optimal or self.args.incremental or self.args.atomic or self.args.patch or self.args.pool or self.args.jobs > 1:
             print("| Advanced Options:")
             if self.args.fill is not None:
                 print(f"|   Fill Value: 0x{self.args.fill:X}")   
@@ -399,6 +505,18 @@ class CLI:
                 print(f"|   Use split pointers method.") 
             if self.args.no_use_end_lines:
                 print("|   Don't use end lines.")
+            if self.args.optimal:
+                print("|   Optimal encoding.")
+            if self.args.incremental:
+                print("|   Incremental insertion.")
+            if self.args.atomic:
+                print("|   Atomic ROM write.")
+            if self.args.patch:
+                print(f"|   Patch File: {self.args.patch}")
+            if self.args.jobs > 1:
+                print(f"|   Jobs: {self.args.jobs}")
+            if self.args.pool:
+                print(f"|   String pooling: {'identical and suffix strings' if self.args.pool == 2 else 'identical strings'}.")
             print("+----------------------------------------------------------------------------------")
 
         # Get Options
@@ -418,8 +536,11 @@ class CLI:
             fill_free_space = True
             fill_free_space_byte = bytes([self.args.fill])
         
-        # Read Script file
-        new_script, _, original_pointers_end_offset, original_pointers_size, script_end_lines = Encoder.read_script(input_file)
+        # Read Script file, the lines are streamed to the encoder unless they are needed twice
+        _, original_pointers_end_offset, original_pointers_size, script_end_lines = Encoder.read_script_header(input_file)
+        new_script = (text for _, _, text, _ in Encoder.iter_script(input_file))
+        if self.args.incremental or self.args.jobs > 1:
+            new_script = list(new_script)
 
         # Parse End Lines
         if self.args.no_use_end_lines:
@@ -437,39 +558,65 @@ class CLI:
         # Load the character table
         char_table, longest_char = Encoder.read_tbl(tbl_file)
 
+        # Previous insertion of this script (re-encodes only changed lines)
+        if self.args.incremental:
+            insert_cache = InsertCache(input_file, tbl_file, rom_file, bracket_index, self.args.optimal)
+            line_cache = insert_cache.lines
+            # A patch is made against the ROM as it is, previous writes can't be skipped
+            write_rom = Encoder.write_rom if self.args.patch else insert_cache.write_rom
+        else:
+            insert_cache = None
+            line_cache = None
+            write_rom = Encoder.write_rom
+
         # Encode Text
-        if self.args.no_use_end_lines:
-            new_script_data, new_script_size, cumulative_lengths = Encoder.encode_script(new_script, None, char_table, longest_char, self.args.no_use_end_lines, bracket_index)
+        script_end_line = None if self.args.no_use_end_lines else end_line
+        if self.args.jobs > 1:
+            new_script_data, new_script_size, cumulative_lengths = Encoder.encode_script_parallel(new_script, script_end_line, char_table, longest_char, self.args.no_use_end_lines, bracket_index, self.args.optimal, self.args.jobs, line_cache)
         else:
-            new_script_data, new_script_size, cumulative_lengths = Encoder.encode_script(new_script, end_line, char_table, longest_char, self.args.no_use_end_lines, bracket_index)
+            new_script_data, new_script_size, cumulative_lengths = Encoder.encode_script(new_script, script_end_line, char_table, longest_char, self.args.no_use_end_lines, bracket_index, self.args.optimal, line_cache)
+
+        # Share repeated strings, the game reads until an end line so it needs end lines
+        pooled_bytes = 0
+        if self.args.pool:
+            if self.args.no_use_end_lines:
+                print("\nERROR: String pooling needs end lines, it can't be used with --no-use-end-lines.")
+                sys.exit(1)
+            new_script_data, cumulative_lengths = Encoder.pool_strings(new_script_data, cumulative_lengths, end_line, self.args.pool == 2)
+            pooled_bytes = new_script_size - len(new_script_data)
+            new_script_size = len(new_script_data)
 
         # Format Pointers
-        if self.args.use_split_pointers is not None:
-            original_pointers_start_offset, original_pointers_end_offset, original_pointers_size = self.args.use_split_pointers
-            new_pointers_data_lsb, new_pointers_data_msb, new_pointers_size = Encoder.calculate_pointers_2_bytes_split(cumulative_lengths, original_text_start_offset, False, base)
-        else:
-            original_pointers_start_offset = self.args.pointers_offset
-            if self.args.p == '2b':
-                new_pointers_data, new_pointers_size = Encoder.calculate_pointers_2_bytes(cumulative_lengths, original_text_start_offset, False, base, 0)
-                pointers_length = 2
-            elif self.args.p == '2bb':
-                new_pointers_data, new_pointers_size = Encoder.calculate_pointers_2_bytes(cumulative_lengths, original_text_start_offset, False, base, 1)
-                pointers_length = 2
-            elif self.args.p == '3b':
-                new_pointers_data, new_pointers_size = Encoder.calculate_pointers_3_bytes(cumulative_lengths, original_text_start_offset, False, base, 0)
-                pointers_length = 3
-            elif self.args.p == '3bb':
-                new_pointers_data, new_pointers_size = Encoder.calculate_pointers_3_bytes(cumulative_lengths, original_text_start_offset, False, base, 1)
-                pointers_length = 3
-            elif self.args.p == '4b':
-                new_pointers_data, new_pointers_size = Encoder.calculate_pointers_4_bytes(cumulative_lengths, original_text_start_offset, False, base, 0)
-                pointers_length = 4
-            elif self.args.p == '4bb':
-                new_pointers_data, new_pointers_size = Encoder.calculate_pointers_4_bytes(cumulative_lengths, original_text_start_offset, False, base, 1)
-                pointers_length = 4
+        try:
+            if self.args.use_split_pointers is not None:
+                original_pointers_start_offset, original_pointers_end_offset, original_pointers_size = self.args.use_split_pointers
+                new_pointers_data_lsb, new_pointers_data_msb, new_pointers_size = Encoder.calculate_pointers_2_bytes_split(cumulative_lengths, original_text_start_offset, False, base)
             else:
-                print("\nError: Invalid pointers format!")
-                sys.exit(1)
+                original_pointers_start_offset = self.args.pointers_offset
+                if self.args.p == '2b':
+                    new_pointers_data, new_pointers_size = Encoder.calculate_pointers_2_bytes(cumulative_lengths, original_text_start_offset, False, base, 0)
+                    pointers_length = 2
+                elif self.args.p == '2bb':
+                    new_pointers_data, new_pointers_size = Encoder.calculate_pointers_2_bytes(cumulative_lengths, original_text_start_offset, False, base, 1)
+                    pointers_length = 2
+                elif self.args.p == '3b':
+                    new_pointers_data, new_pointers_size = Encoder.calculate_pointers_3_bytes(cumulative_lengths, original_text_start_offset, False, base, 0)
+                    pointers_length = 3
+                elif self.args.p == '3bb':
+                    new_pointers_data, new_pointers_size = Encoder.calculate_pointers_3_bytes(cumulative_lengths, original_text_start_offset, False, base, 1)
+                    pointers_length = 3
+                elif self.args.p == '4b':
+                    new_pointers_data, new_pointers_size = Encoder.calculate_pointers_4_bytes(cumulative_lengths, original_text_start_offset, False, base, 0)
+                    pointers_length = 4
+                elif self.args.p == '4bb':
+                    new_pointers_data, new_pointers_size = Encoder.calculate_pointers_4_bytes(cumulative_lengths, original_text_start_offset, False, base, 1)
+                    pointers_length = 4
+                else:
+                    print("\nError: Invalid pointers format!")
+                    sys.exit(1)
+        except ValueError as e:
+            print(f"\nERROR: {e}")
+            sys.exit(1)
 
         # Write ROM
         if new_script_size > original_text_size:
@@ -478,17 +625,37 @@ class CLI:
         if new_pointers_size > original_pointers_size:
             print(f"\nERROR: Table pointer size has exceeded its maximum size. Remove {(new_pointers_size - original_pointers_size)//2} lines in script.\n")
             sys.exit(1)         
-        free_space_script = Encoder.write_rom(rom_file, original_text_start_offset, original_text_size, new_script_data, fill_free_space, fill_free_space_byte)
-        print(f"|   Script written at address 0x{original_text_start_offset:X}, {free_space_script} bytes of free space.")
+        rom_patch = RomPatch(rom_file)
+        free_space_script = write_rom(rom_patch, original_text_start_offset, original_text_size, new_script_data, fill_free_space, fill_free_space_byte)
 
         if self.args.use_split_pointers is None:
-            free_space_pointers = Encoder.write_rom(rom_file, original_pointers_start_offset, original_pointers_size, new_pointers_data, False, fill_free_space_byte)
-            print(f"|   Pointers table written at address 0x{original_pointers_start_offset:X}, {free_space_pointers//pointers_length} lines/pointers left.")
+            free_space_pointers = write_rom(rom_patch, original_pointers_start_offset, original_pointers_size, new_pointers_data, False, fill_free_space_byte)
+            free_pointers = free_space_pointers // pointers_length
+        else:
+            free_space_pointers = write_rom(rom_patch, original_pointers_start_offset, original_pointers_size, new_pointers_data_lsb, False, fill_free_space_byte)
+            free_space_pointers = write_rom(rom_patch, original_pointers_end_offset, original_pointers_size, new_pointers_data_msb, False, fill_free_space_byte)
+            free_pointers = free_space_pointers // 2
 
+        # Apply all the writes at once, or save them as a patch
+        if self.args.patch:
+            try:
+                bytes_written = Patch.write(self.args.patch, rom_patch)
+            except ValueError as e:
+                print(f"\nERROR: {e}")
+                sys.exit(1)
+        else:
+            bytes_written = rom_patch.commit(self.args.atomic)
+        print(f"|   Script written at address 0x{original_text_start_offset:X}, {free_space_script} bytes of free space.")
+        print(f"|   Pointers table written at address 0x{original_pointers_start_offset:X}, {free_pointers} lines/pointers left.")
+        if self.args.pool:
+            print(f"|   String pooling: {pooled_bytes} bytes saved.")
+        if self.args.patch:
+            print(f"|   Patch written to {self.args.patch}, {bytes_written} bytes changed.")
         else:
-            free_space_pointers = Encoder.write_rom(rom_file, original_pointers_start_offset, original_pointers_size, new_pointers_data_lsb, False, fill_free_space_byte)
-            free_space_pointers = Encoder.write_rom(rom_file, original_pointers_end_offset, original_pointers_size, new_pointers_data_msb, False, fill_free_space_byte)
-            print(f"|   Pointers table written at address 0x{original_pointers_start_offset:X}, {free_space_pointers//2} lines/pointers left.")
+            print(f"|   ROM updated, {bytes_written} bytes written.")
+        if insert_cache is not None:
+            insert_cache.save(new_script)
+            print(f"|   Incremental: {len(insert_cache.lines) - insert_cache.cached_lines} lines encoded.")
         print("|   Insertion Done!")
         print("+----------------------------------------------------------------------------------")
 
@@ -527,6 +694,7 @@ class CLI:
                                     help='Needed three arguments: lsb_offset, msb_offset, size for split pointers')
         extract_parser.add_argument('--no-use-end-lines', type=lambda x: int(x, 16), 
                                     help='Provide a hexadecimal value text_end_offset')
+        extract_parser.add_argument('--jobs', type=int, default=1, help='Number of worker processes for decoding. (Default: 1)')
 
         # Insert
         insert_parser = subparsers.add_parser('insert', help='Insert text into ROM')
@@ -552,6 +720,12 @@ class CLI:
                                     help='Three hex values: lsb, msb, size for split pointers')
         insert_parser.add_argument('--no-use-end-lines', type=lambda x: int(x, 16), 
                                     help='Provide text end offset address')
+        insert_parser.add_argument('--optimal', action='store_true', help='Encode with the fewest bytes instead of the longest match')
+        insert_parser.add_argument('--incremental', action='store_true', help='Reuse the previous insertion, re-encode and write only changed lines')
+        insert_parser.add_argument('--atomic', action='store_true', help='Write a patched copy of the ROM and rename it over the ROM')
+        insert_parser.add_argument('--jobs', type=int, default=1, help='Number of worker processes for encoding. (Default: 1)')
+        insert_parser.add_argument('--pool', choices=[0, 1, 2], type=int, default=0, help='Share identical strings (1), also strings that end another one (2). (Default: 0)')
+        insert_parser.add_argument('--patch', help='Write an IPS/BPS patch (by extension) instead of modifying the ROM')
 
         # Extract Script Config
         extractconfig_parser = subparsers.add_parser('extractconfig', help='Extract using JSON config file')
@@ -560,6 +734,10 @@ class CLI:
         # Insert Script Config
         insertconfig_parser = subparsers.add_parser('insertconfig', help='Insert using JSON config file')
         insertconfig_parser.add_argument('config', help='Path to config.json')
+
+        # Extract Project
+        extractproject_parser = subparsers.add_parser('extractproject', help='Extract many blocks using a JSON project file')
+        extractproject_parser.add_argument('project', help='Path to project.json')
         
         return parser
 
@@ -578,6 +756,26 @@ class CLI:
         elif self.args.command == 'insertconfig':
             self.handle_insert_config()
             self.handle_insert()
+        elif self.args.command == 'extractproject':
+            self.handle_extract_project()
         else:
             self.show_help()
 
+
+# Project extraction, ROM files and tables of the current process
+project_worker = {"roms": {}, "tables": {}}
+
+def extract_project_block(args):
+    roms = project_worker["roms"]
+    tables = project_worker["tables"]
+    if args.rom not in roms:
+        roms[args.rom] = Rom(args.rom)
+    if args.tbl not in tables:
+        tables[args.tbl] = Decoder.read_tbl(args.tbl)
+    return CLI.extract_script(args, roms[args.rom], tables[args.tbl])
+
+def close_project_worker():
+    for rom in project_worker["roms"].values():
+        rom.close()
+    project_worker["roms"].clear()
+    project_worker["tables"].clear()
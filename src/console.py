@@ -21,10 +21,12 @@
 
 import sys
 import os
+from multiprocessing import freeze_support
 from cli import CLI
 
     
 if __name__ == '__main__':
+    freeze_support()
     if len(sys.argv) > 1:
         cli = CLI()  
         cli.parse_arguments()
@@ -1,3 +1,29 @@
+import os
+import sys
+from bisect import bisect_left
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from rom import Rom, RomView
+from table import Table
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Unsigned array typecodes by size
+UINT16 = 'H'
+UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+
+# Decoded lines kept for shared pointers
+DECODE_CACHE_SIZE = 4096
+
+# ROM bytes after a decompressed script decoded with it, so tokens at its end don't need the view
+SCRIPT_TAIL_SIZE = 256
+
+# Output script buffer
+WRITE_BUFFER_SIZE = 1 << 20
+
 class Decoder:
     def __init__(self):
         """
@@ -35,25 +61,61 @@ class Decoder:
         Returns:
             char_table (dict): A dictionary where keys are byte sequences (as `bytes`) and values are strings (characters or sequences).
         """               
-        char_table = {}
-        
-        with open(tbl_file, "r", encoding="UTF-8") as f:
-            for line in f:
-                if not line or line.startswith(";") or line.startswith("/"):
-                    continue  
-                if "=" in line:
-                    hex_value, chars = line.split("=", 1)
-                    try:
-                        if len(hex_value) % 2 != 0:
-                            print(f"Warning: '{hex_value}' is invalid! Skipped.")
-                            continue
-                        byte_key = bytes.fromhex(hex_value)
-                        char_table[byte_key] = chars.strip("\n")
-                    except ValueError:
-                        print(f"Warning: '{hex_value}' is invalid! Skipped.")
-                        continue
+        # Parsed once, then loaded from the compiled cache
+        char_table, _, _ = Table.load(tbl_file)
         return char_table
 
+    def unpack_pointers(data, pointer_length, base, endianness):
+        """
+        Decodes a whole pointer table in one pass, then adds the base and clamps
+        negative values to 0. Uses NumPy when it is installed, otherwise array.
+
+        Parameters:
+            data (bytes): The raw pointer data read from the ROM.
+            pointer_length (int): Bytes per pointer (2, 3 or 4).
+            base (int): The offset to add to each pointer.
+            endianness (int): Determines the byte order (0 for little-endian, 1 for big-endian, 2 for little-endian bank).
+
+        Returns:
+            array: The pointers as a compact integer array (numpy.ndarray or array('q')).
+        """
+        byteorder = 'big' if endianness == 1 else 'little'
+        count = len(data) // pointer_length
+        table = bytes(data[:count * pointer_length])
+        tail = bytes(data[count * pointer_length:])
+
+        # Widen 3 bytes pointers to 4 bytes, incomplete triplets are ignored
+        if pointer_length == 3:
+            wide = bytearray(count * 4)
+            shift = 1 if byteorder == 'big' else 0
+            for i in range(3):
+                wide[i + shift::4] = table[i::3]
+            table = bytes(wide)
+            tail = b""
+            pointer_length = 4
+
+        if numpy is not None:
+            dtype = ('>' if byteorder == 'big' else '<') + f"u{pointer_length}"
+            values = numpy.frombuffer(table, dtype=dtype).astype(numpy.int64)
+            if tail:
+                values = numpy.append(values, int.from_bytes(tail, byteorder))
+            values += base
+            numpy.maximum(values, 0, out=values)
+            return values
+
+        values = array(UINT16 if pointer_length == 2 else UINT32, table)
+        if byteorder != sys.byteorder:
+            values.byteswap()
+        values = array('q', values)
+        # An incomplete last pointer is read with the bytes left
+        if tail:
+            values.append(int.from_bytes(tail, byteorder))
+        if base > 0:
+            values = array('q', [value + base for value in values])
+        elif base < 0:
+            values = array('q', [value + base if value + base > 0 else 0 for value in values])
+        return values
+
     def process_pointers_2_bytes(data, base, endianness):
         """
         Processes the pointer data by converting it to pairs and transforming it to big-endian,
@@ -67,17 +129,7 @@ class Decoder:
         Returns:
             list: A list of processed pointers as integers.
         """
-        result = []
-        for i in range(0, len(data), 2):
-            pair = data[i:i + 2]
-            if endianness == 0:
-                value = int.from_bytes(pair, byteorder='little') + base
-            elif endianness == 1:
-                value = int.from_bytes(pair, byteorder='big') + base
-            if value < 0:
-                value = 0
-            result.append(value)
-        return result
+        return Decoder.unpack_pointers(data, 2, base, endianness).tolist()
 
     def process_pointers_split_2_bytes(lsb, msb, base):
         """
@@ -92,14 +144,11 @@ class Decoder:
         Returns:
             list: A list of processed pointers as integers.
         """
-        result = []
-        for i in range(len(lsb)):
-            pair = [lsb[i], msb[i]]
-            value = int.from_bytes(pair, byteorder='little') + base
-            if value < 0:
-                value = 0
-            result.append(value)
-        return result
+        # Interleave both tables as a little-endian 2 bytes table
+        data = bytearray(len(lsb) * 2)
+        data[0::2] = lsb
+        data[1::2] = msb[:len(lsb)]
+        return Decoder.unpack_pointers(data, 2, base, 0).tolist()
 
     def process_pointers_3_bytes(data, base, endianness):
         """
@@ -115,24 +164,7 @@ class Decoder:
         Returns:
             list: A list of processed pointers as integers.
         """
-        result = []
-        for i in range(0, len(data), 3):
-            triplet = data[i:i + 3]
-            if len(triplet) < 3:
-                continue
-            low = triplet[0]
-            high = triplet[1]
-            bank = triplet[2]
-            if endianness == 0:
-                value = int.from_bytes([low, high, bank], byteorder='little') + base
-            elif endianness == 1:
-                value = int.from_bytes([low, high, bank], byteorder='big') + base
-            elif endianness == 2:
-                value = int.from_bytes([bank, high, low], byteorder='big') + base
-            if value < 0:
-                value = 0 
-            result.append(value)    
-        return result
+        return Decoder.unpack_pointers(data, 3, base, endianness).tolist()
 
     def process_pointers_4_bytes(data, base, endianness):
         """
@@ -147,18 +179,59 @@ class Decoder:
         Returns:
             list: A list of processed pointers as integers.
         """
-        result = []
-        for i in range(0, len(data), 4):
-            quartet = data[i:i + 4]
-            #use_last_pair = quartet[2:]
-            if endianness == 0:
-                value = int.from_bytes(quartet, byteorder='little') + base
-            elif endianness == 1:
-                value = int.from_bytes(quartet, byteorder='big') + base
-            if value < 0:
-                value = 0
-            result.append(value)
-        return result
+        return Decoder.unpack_pointers(data, 4, base, endianness).tolist()
+
+    def compile_tbl(char_table):
+        """
+        Compiles a character table into a byte trie for longest-match decoding.
+
+        Every node is a tuple (children, text), children maps the next byte value to
+        another node and text is the decoded string when the path is a full key (else None).
+
+        Parameters:
+            char_table (dict): A dictionary mapping byte sequences (bytes) to characters or sequences.
+
+        Returns:
+            tuple: The root node of the trie.
+        """
+        root = ({}, None)
+        for key, chars in char_table.items():
+            if not key:
+                continue
+            node = root
+            for byte in key[:-1]:
+                children = node[0]
+                if byte not in children:
+                    children[byte] = ({}, None)
+                node = children[byte]
+            children = node[0]
+            last = key[-1]
+            if last in children:
+                children[last] = (children[last][0], chars)
+            else:
+                children[last] = ({}, chars)
+        return root
+
+    def raw_byte_brackets(bracket_index):
+        """
+        Builds the bracket text for every byte value, used for bytes not found in the .tbl.
+
+        Parameters:
+            bracket_index (int): Specifies the bracket style to use around unknown bytes.
+
+        Returns:
+            list: 256 strings, indexed by byte value.
+        """
+        # Bracket formats
+        bracket_formats = {
+            0: "~{0}~",
+            1: "[{0}]",
+            2: "{{{0}}}",
+            3: "<{0}>"
+        }
+
+        bracket_format = bracket_formats.get(bracket_index)
+        return [bracket_format.format(f"{i:02X}") for i in range(256)]
 
     def decode_script(rom_data, addresses_list, end_line, char_table, bracket_index):
         """
@@ -178,74 +251,206 @@ class Decoder:
                 - total_bytes_read (int): Total text block size.
                 - lines_length (list): Length of each line in bytes.
         """             
+        # Compile .tbl keys into a byte trie
+        trie = Decoder.compile_tbl(char_table)
+
+        texts, lines_length = Decoder.decode_lines(rom_data, addresses_list, end_line, trie, bracket_index)
+
+        total_bytes_read = abs((addresses_list[-1] + lines_length[-1]) - addresses_list[0])
+        return texts, total_bytes_read, lines_length
+
+    def iter_decode_script(rom_data, addresses_list, end_line, char_table, bracket_index):
+        """
+        Same as decode_script, but yields every line as soon as it is decoded.
+
+        Returns:
+            generator: Records (index, address, text, byte_length).
+        """
+        trie = Decoder.compile_tbl(char_table)
+        yield from Decoder.iter_decode_lines(rom_data, addresses_list, end_line, trie, bracket_index)
+
+    def decode_lines(rom_data, addresses_list, end_line, trie, bracket_index):
+        """
+        Decodes the lines at the specified addresses until a end line, using a compiled trie.
+
+        Parameters:
+            rom_data (bytes): The complete ROM data.
+            addresses_list (list): A list of addresses to read the texts from.
+            end_line (set): A set of byte values used as end_lines
+            trie (tuple): Byte trie returned by compile_tbl.
+            bracket_index (int): Specifies the bracket style to use around unknown bytes.
+
+        Returns:
+            tuple: Containing:
+                - texts (list): Extracted script text.
+                - lines_length (list): Length of each line in bytes.
+        """
         texts = []  
         lines_length = []
-        total = 0
+        for _, _, text, byte_length in Decoder.iter_decode_lines(rom_data, addresses_list, end_line, trie, bracket_index):
+            texts.append(text)
+            lines_length.append(byte_length)
+        return texts, lines_length
 
-        # Bracket formats
-        bracket_formats = {
-            0: "~{0}~",
-            1: "[{0}]",
-            2: "{{{0}}}",
-            3: "<{0}>"
-        }
+    def iter_decode_lines(rom_data, addresses_list, end_line, trie, bracket_index):
+        """
+        Decodes the lines at the specified addresses until a end line, one line at a time.
 
-        bracket_format = bracket_formats.get(bracket_index)
+        Parameters:
+            rom_data (bytes): The complete ROM data.
+            addresses_list (list): A list of addresses to read the texts from.
+            end_line (set): A set of byte values used as end_lines
+            trie (tuple): Byte trie returned by compile_tbl.
+            bracket_index (int): Specifies the bracket style to use around unknown bytes.
 
-        # Sort keys from .tbl
-        key_lengths = sorted({len(k) for k in char_table.keys()}, reverse=True)
+        Returns:
+            generator: Records (index, address, text, byte_length).
+        """
+        raw_bytes = Decoder.raw_byte_brackets(bracket_index)
+        root = trie[0]
+        rom_size = len(rom_data)
 
-        for start_addr in addresses_list:
-            addr = start_addr
-            text = bytearray()
-            bytes_line_counter = 0
+        # Decompressed scripts are read as plain bytes, only lines that read past them use the view
+        script = Decoder.script_data(rom_data)
+        script_size = len(script)
 
-            while addr < len(rom_data):
-                matched = False
+        # Lines already decoded by start address (shared pointers)
+        decoded_lines = {}
 
-                for length in key_lengths:
-                    if addr + length > len(rom_data):
-                        continue
+        for index, start_addr in enumerate(addresses_list):
+            if start_addr in decoded_lines:
+                decoded_text, bytes_line_counter = decoded_lines[start_addr]
+                yield index, start_addr, decoded_text, bytes_line_counter
+                continue
 
-                    segment = rom_data[addr:addr + length]
+            decoded_text, addr, reached_end = Decoder.decode_line(script, script_size, start_addr, end_line, root, raw_bytes)
+            if (reached_end or start_addr < 0) and script_size < rom_size:
+                decoded_text, addr, _ = Decoder.decode_line(rom_data, rom_size, start_addr, end_line, root, raw_bytes)
+            bytes_line_counter = addr - start_addr
 
-                    if segment in char_table:
-                        char = char_table[segment]
-                        text.extend(char.encode('utf-8'))
-                        addr += length
-                        bytes_line_counter += length
+            # Keep the cache bounded, drop the oldest line
+            if len(decoded_lines) >= DECODE_CACHE_SIZE:
+                del decoded_lines[next(iter(decoded_lines))]
+            decoded_lines[start_addr] = (decoded_text, bytes_line_counter)
+            yield index, start_addr, decoded_text, bytes_line_counter
 
-                        # If end line
-                        if length == 1 and segment[0] in end_line:
-                            matched = True
-                            break
-                        matched = True
-                        break
+    def decode_line(rom_data, rom_size, start_addr, end_line, root, raw_bytes):
+        """
+        Decodes one line from its address until a end line.
 
-                if matched:
-                    if length == 1 and segment[0] in end_line:
-                        break 
-                    continue
+        Parameters:
+            rom_data (bytes): The data the line is read from.
+            rom_size (int): The size of the data.
+            start_addr (int): The address of the line.
+            end_line (set): A set of byte values used as end_lines
+            root (dict): Root children of the byte trie returned by compile_tbl.
+            raw_bytes (list): Bracket text of every byte value, from raw_byte_brackets.
 
-                # If raw byte
+        Returns:
+            tuple: Containing:
+                - text (str): The decoded line.
+                - addr (int): The address after the line.
+                - reached_end (bool): True if decoding read up to the end of the data.
+        """
+        addr = start_addr
+        text = []
+        reached_end = False
+
+        while addr < rom_size:
+            # Walk the trie to find the longest key
+            children = root
+            pos = addr
+            match_length = 0
+            while pos < rom_size:
+                node = children.get(rom_data[pos])
+                if node is None:
+                    break
+                pos += 1
+                children, chars = node
+                if chars is not None:
+                    match_length = pos - addr
+                    match_chars = chars
+            if pos == rom_size:
+                reached_end = True
+
+            if match_length:
+                text.append(match_chars)
                 byte = rom_data[addr]
-                hex_value = format(byte, '02X')
-                bracket = bracket_format.format(hex_value)
-                text.extend(bracket.encode('utf-8'))
-                addr += 1
-                bytes_line_counter += 1
+                addr += match_length
 
-                if byte in end_line:
+                # If end line
+                if match_length == 1 and byte in end_line:
                     break
+                continue
+
+            # If raw byte
+            byte = rom_data[addr]
+            text.append(raw_bytes[byte])
+            addr += 1
+
+            if byte in end_line:
+                break
+
+        if addr >= rom_size:
+            reached_end = True
+        return ''.join(text), addr, reached_end
+
+    def script_data(rom_data):
+        """
+        Returns the bytes a decompressed script (RomView) is decoded from: the script and the first
+        SCRIPT_TAIL_SIZE bytes of the ROM after it. Other data is returned as it is.
+        """
+        if isinstance(rom_data, RomView):
+            return rom_data.head + bytes(rom_data.tail[:SCRIPT_TAIL_SIZE])
+        return rom_data
+
+    def decode_script_parallel(rom_file, addresses_list, end_line, char_table, bracket_index, jobs):
+        """
+        Same as decode_script, but splits the addresses list across a pool of worker processes.
+        Every worker maps the ROM file by itself, so the ROM data is never pickled.
 
-            decoded_text = text.decode('utf-8', errors='replace')
-            texts.append(decoded_text)
-            lines_length.append(bytes_line_counter)
-            total += bytes_line_counter
+        Parameters:
+            rom_file (str): The path to the ROM file.
+            addresses_list (list): A list of addresses to read the texts from.
+            end_line (set): A set of byte values used as end_lines
+            char_table (dict): A dictionary mapping byte values or sequences to characters.
+            bracket_index (int): Specifies the bracket style to use around unknown bytes.
+            jobs (int): Number of worker processes.
+
+        Returns:
+            tuple: Containing:
+                - texts (list): Extracted script text.
+                - total_bytes_read (int): Total text block size.
+                - lines_length (list): Length of each line in bytes.
+        """
+        texts = []
+        lines_length = []
+        for _, _, text, byte_length in Decoder.iter_decode_script_parallel(rom_file, addresses_list, end_line, char_table, bracket_index, jobs):
+            texts.append(text)
+            lines_length.append(byte_length)
 
         total_bytes_read = abs((addresses_list[-1] + lines_length[-1]) - addresses_list[0])
         return texts, total_bytes_read, lines_length
 
+    def iter_decode_script_parallel(rom_file, addresses_list, end_line, char_table, bracket_index, jobs):
+        """
+        Same as decode_script_parallel, but yields the lines of every chunk as soon as it is merged.
+
+        Returns:
+            generator: Records (index, address, text, byte_length).
+        """
+        # A few chunks per worker keeps the pool balanced
+        chunk_size = max(1, -(-len(addresses_list) // (jobs * 4)))
+        chunks = [(addresses_list[i:i + chunk_size], end_line, bracket_index) for i in range(0, len(addresses_list), chunk_size)]
+
+        index = 0
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_decode_worker, initargs=(rom_file, char_table)) as pool:
+            # Results are merged in the original pointer order
+            for chunk, (chunk_texts, chunk_lines_length) in zip(chunks, pool.map(decode_worker_chunk, chunks)):
+                for address, text, byte_length in zip(chunk[0], chunk_texts, chunk_lines_length):
+                    yield index, address, text, byte_length
+                    index += 1
+
     def decode_script_no_end_line(rom_data, addresses_list, end_offset, char_table, bracket_index):
         """
         Extracts texts from the ROM data at specified addresses based on the lengths in lines_length.
@@ -265,59 +470,122 @@ class Decoder:
         """
         texts = []  
         lines_length = []
-        total = 0
+        for _, _, text, length in Decoder.iter_decode_script_no_end_line(rom_data, addresses_list, end_offset, char_table, bracket_index):
+            texts.append(text)
+            lines_length.append(length)
 
-        # Bracket formats
-        bracket_formats = {
-            0: "~{0}~",
-            1: "[{0}]",  
-            2: "{{{0}}}", 
-            3: "<{0}>"
-        }
+        total_bytes_read = sum(lines_length)
+        return texts, total_bytes_read, lines_length
 
-        bracket_format = bracket_formats.get(bracket_index)
+    def iter_decode_script_no_end_line(rom_data, addresses_list, end_offset, char_table, bracket_index):
+        """
+        Same as decode_script_no_end_line, but yields every line as soon as it is decoded.
+        The text block is decoded once and cut at the pointers, lines starting inside
+        a multi-byte token are decoded again on their own.
+
+        Returns:
+            generator: Records (index, address, text, byte_length).
+        """
+        raw_bytes = Decoder.raw_byte_brackets(bracket_index)
 
-        # Add final offset to the addresses list
-        addresses_list.append(end_offset)
+        # Compile .tbl keys into a byte trie
+        root = Decoder.compile_tbl(char_table)[0]
 
-        # Calculate line lengths
-        for i in range(len(addresses_list) - 1):
-            length = int(addresses_list[i + 1]) - int(addresses_list[i])
-            lines_length.append(length)
+        if not addresses_list:
+            return
 
-        # Prepare sorted multibyte keys for efficient matching
-        sorted_keys = sorted(char_table.keys(), key=lambda k: len(k), reverse=True)
-
-        for i in range(len(addresses_list) - 1):
-            start_addr = addresses_list[i]
-            length = lines_length[i]
-            end_addr = start_addr + length          
-            text = bytearray()
-            addr = start_addr
-
-            while addr < end_addr:
-                matched = False
-                for key in sorted_keys:
-                    key_len = len(key)
-                    if rom_data[addr:addr + key_len] == key:
-                        text.extend(char_table[key].encode('utf-8'))
-                        addr += key_len
-                        matched = True
-                        break
-                if not matched:
-                    # Unknown byte: wrap in bracket
-                    byte = rom_data[addr]
-                    hex_value = format(byte, '02X')
-                    bracket = bracket_format.format(hex_value)
-                    text.extend(bracket.encode('utf-8'))
-                    addr += 1
-
-            decoded_text = text.decode('utf-8', errors='replace')
-            texts.append(decoded_text)
-            total += length
-
-        total_bytes_read = total
-        return texts, total_bytes_read, lines_length
+        # Every line ends where the next one starts, the last one at end_offset
+        end_addresses = list(addresses_list[1:]) + [end_offset]
+
+        # Decompressed scripts are read as plain bytes, only ranges that read past them use the view
+        script = Decoder.script_data(rom_data)
+        script_size = len(script)
+
+        # Decode the whole text block once
+        block_start = int(min(addresses_list))
+        tokens, offsets = Decoder.decode_range(script, script_size, rom_data, block_start, end_offset, root, raw_bytes)
+
+        for index, (start_addr, end_addr) in enumerate(zip(addresses_list, end_addresses)):
+            length = int(end_addr) - int(start_addr)
+            first = bisect_left(offsets, start_addr)
+
+            if first < len(offsets) and offsets[first] == start_addr and end_addr <= offsets[-1]:
+                # Line starts on a token inside the block, slice it
+                last = bisect_left(offsets, end_addr, first)
+                text = ''.join(tokens[first:last])
+            else:
+                # Pointer inside a multi-byte token (or line outside the block)
+                line_tokens, _ = Decoder.decode_range(script, script_size, rom_data, start_addr, end_addr, root, raw_bytes)
+                text = ''.join(line_tokens)
+
+            yield index, start_addr, text, length
+
+    def decode_range(script, script_size, rom_data, start_addr, end_addr, root, raw_bytes):
+        """
+        Same as decode_block, the range is read from the script bytes of script_data when it lies inside them.
+
+        Returns:
+            tuple: Same as decode_block, without reached_end.
+        """
+        if 0 <= start_addr and end_addr <= script_size:
+            tokens, offsets, reached_end = Decoder.decode_block(script, start_addr, end_addr, root, raw_bytes)
+            if not reached_end or script_size == len(rom_data):
+                return tokens, offsets
+        tokens, offsets, _ = Decoder.decode_block(rom_data, start_addr, end_addr, root, raw_bytes)
+        return tokens, offsets
+
+    def decode_block(rom_data, start_addr, end_addr, root, raw_bytes):
+        """
+        Decodes a range of the ROM into tokens, keeping the address of every token.
+
+        Parameters:
+            rom_data (bytes): The complete ROM data.
+            start_addr (int): The first address of the range.
+            end_addr (int): The address where decoding stops (the last token may cross it).
+            root (dict): Root children of the byte trie returned by compile_tbl.
+            raw_bytes (list): Bracket text of every byte value, from raw_byte_brackets.
+
+        Returns:
+            tuple: Containing:
+                - tokens (list): Decoded text of every token.
+                - offsets (list): Address of every token, plus the address after the last one.
+                - reached_end (bool): True if decoding read up to the end of the data.
+        """
+        rom_size = len(rom_data)
+        tokens = []
+        offsets = []
+        addr = start_addr
+        reached_end = False
+
+        while addr < end_addr:
+            offsets.append(addr)
+
+            # Walk the trie to find the longest key
+            children = root
+            pos = addr
+            match_length = 0
+            while pos < rom_size:
+                node = children.get(rom_data[pos])
+                if node is None:
+                    break
+                pos += 1
+                children, chars = node
+                if chars is not None:
+                    match_length = pos - addr
+                    match_chars = chars
+            if pos == rom_size:
+                reached_end = True
+
+            if match_length:
+                tokens.append(match_chars)
+                addr += match_length
+            else:
+                # Unknown byte: wrap in bracket
+                tokens.append(raw_bytes[rom_data[addr]])
+                addr += 1
+
+        offsets.append(addr)
+        return tokens, offsets, reached_end
 
     def parse_end_lines(string):
         """
@@ -363,27 +631,79 @@ class Decoder:
             lines_length (list): A list of the length of each line in the script.
             line_breaker (int): A value used to split lines.
             no_comments (bool): Flag indicating whether to include comments (default is False).
+
+        Returns:
+            int: Number of pointers sharing their address with a previous pointer.
         """
-        with open(file, "w", encoding='UTF-8') as f:
-            if not end_line == None:
-                formatted_string = Decoder.format_hex_string(end_line)
-                f.write(f";{{{pointers_start_address:08X}-{(pointers_end_address):08X}-{pointer_size:08X}}}{formatted_string}\n")
-            else:
-                f.write(f";{{{pointers_start_address:08X}-{(pointers_end_address):08X}-{pointer_size:08X}}}\n")          
-            i = 0
-            for line in script_text:
-                # Format the address as uppercase hex with leading zeros
-                address_str = f"{pointers_list[i]:08X}"
-                
-                # Write the formatted address followed by the line content and length
-                f.write(f"@{i+1}\n")
-                
-                # Write the comment section based on no_comments flag
-                if no_comments:
-                    f.write(f";{address_str}#{len(line)}#{lines_length[i]}\n")
+        records = zip(range(len(script_text)), pointers_list, script_text, lines_length)
+        _, shared_pointers = Decoder.write_out_stream(file, records, pointers_start_address, pointers_end_address, pointer_size, end_line, no_comments)
+        return shared_pointers
+
+    def write_out_stream(file, records, pointers_start_address, pointers_end_address, pointer_size, end_line, no_comments):
+        """
+        Writes the script while the lines are decoded, same format as write_out_file.
+        The lines go to a temporary file that replaces the output only once every line is decoded,
+        so a decoding error doesn't leave a truncated script over a previous one.
+
+        Parameters:
+            file (str): The path to the output file.
+            records (iterable): Records (index, address, text, byte_length), as yielded by the iter_decode_* functions.
+            pointers_start_address (int): The starting address of the pointer table.
+            pointers_end_address (int): The end address of the pointer table.
+            pointer_size (int): The size of the pointer table.
+            end_line (set): End lines codes written in the header (None if not used).
+            no_comments (bool): Flag indicating whether to include comments (default is False).
+
+        Returns:
+            tuple: Containing:
+                - total_bytes_read (int): Total text block size.
+                - shared_pointers (int): Number of pointers sharing their address with a previous pointer.
+        """
+        seen_addresses = set()
+        shared_pointers = 0
+        first_address = None
+        last_end = 0
+
+        temp_file = file + ".tmp"
+        try:
+            with open(temp_file, "w", encoding='UTF-8', buffering=WRITE_BUFFER_SIZE) as f:
+                if not end_line == None:
+                    formatted_string = Decoder.format_hex_string(end_line)
+                    f.write(f";{{{pointers_start_address:08X}-{(pointers_end_address):08X}-{pointer_size:08X}}}{formatted_string}\n")
                 else:
-                    f.write(f";{address_str}{{{line}}}#{len(line)}#{lines_length[i]}\n")
-                
-                f.write(f"{line}\n")
-                f.write("|\n")
-                i += 1
+                    f.write(f";{{{pointers_start_address:08X}-{(pointers_end_address):08X}-{pointer_size:08X}}}\n")          
+                for i, address, line, length in records:
+                    # Write the comment section based on no_comments flag
+                    if no_comments:
+                        f.write(f"@{i+1}\n;{address:08X}#{len(line)}#{length}\n{line}\n|\n")
+                    else:
+                        f.write(f"@{i+1}\n;{address:08X}{{{line}}}#{len(line)}#{length}\n{line}\n|\n")
+
+                    if address in seen_addresses:
+                        shared_pointers += 1
+                    else:
+                        seen_addresses.add(address)
+                    if first_address is None:
+                        first_address = address
+                    last_end = address + length
+        except BaseException:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            raise
+        os.replace(temp_file, file)
+
+        total_bytes_read = abs(last_end - first_address) if first_address is not None else 0
+        return total_bytes_read, shared_pointers
+
+# Parallel decoding workers (state is per process)
+decode_worker = {}
+
+def init_decode_worker(rom_file, char_table):
+    decode_worker["rom"] = Rom(rom_file)
+    decode_worker["trie"] = Decoder.compile_tbl(char_table)
+
+def decode_worker_chunk(chunk):
+    addresses_list, end_line, bracket_index = chunk
+    return Decoder.decode_lines(decode_worker["rom"].data, addresses_list, end_line, decode_worker["trie"], bracket_index)
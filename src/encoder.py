@@ -1,4 +1,29 @@
 import re
+import struct
+from table import Table
+from concurrent.futures import ProcessPoolExecutor
+
+# Raw byte brackets by bracket index
+BRACKETS = {
+    0: ("~", "~"),
+    1: ("[", "]"),
+    2: ("{", "}"),
+    3: ("<", ">")
+}
+
+# Compiled line tokenizers by bracket index
+TOKENIZERS = {}
+
+# Line comment written by the extraction, ;ADDRESS{text}#chars#bytes (the text is optional)
+SCRIPT_COMMENT = re.compile(r";([0-9A-Fa-f]+)(?:\{.*\})?#\d+#(\d+)$", re.DOTALL)
+
+# struct format of the pointer sizes packed in bulk
+POINTER_FORMATS = {
+    1: "B",
+    2: "H",
+    4: "I",
+    8: "Q"
+}
 
 class Encoder:
     def __init__(self):
@@ -23,20 +48,67 @@ class Encoder:
                 - pointer_table_size (int): The size of the pointer table.
                 - end_lines (str): A string representing the line breakers used in the file.
         """
-        hex_data = []
-        end_lines=''
+        pointers_start_address, pointers_end_address, pointer_table_size, end_lines = Encoder.read_script_header(file)
+        script = [text for _, _, text, _ in Encoder.iter_script(file)]
+        return script, pointers_start_address, pointers_end_address, pointer_table_size, end_lines
+
+    def read_script_header(file):
+        """
+        Reads the pointer information and the line breakers from the first line of a script file.
+
+        Parameters:
+            file (str): The path to the file to read.
+
+        Returns:
+            tuple: Contains:
+                - pointers_start_address (int): The start address of the pointers.
+                - pointers_end_address (int): The end address of the pointers.
+                - pointer_table_size (int): The size of the pointer table.
+                - end_lines (str): A string representing the line breakers used in the file.
+        """
         with open(file, "r", encoding='UTF-8') as f:
             first_line = f.readline().strip()
-            match = re.match(r";\{([0-9A-Fa-f\-]+)\}(?:-(.*))?", first_line)
-            offsets = match.group(1)
-            hex_data.extend([int(addr, 16) for addr in offsets.split('-')])
-            byte = match.group(2)
-            end_lines = ",".join(byte.split('-')) if byte else None
-            script = [
-                line.rstrip('\n') for line in f.readlines()
-                if not (line.startswith(";") or line.startswith("@") or line.startswith("|") or line.startswith("/"))
-            ]
-        return script, hex_data[0], hex_data[1], hex_data[2], end_lines
+        match = re.match(r";\{([0-9A-Fa-f\-]+)\}(?:-(.*))?", first_line)
+        offsets = match.group(1)
+        hex_data = [int(addr, 16) for addr in offsets.split('-')]
+        byte = match.group(2)
+        end_lines = ",".join(byte.split('-')) if byte else None
+        return hex_data[0], hex_data[1], hex_data[2], end_lines
+
+    def iter_script(file):
+        """
+        Reads the script lines of a script file one by one, with the data written by the extraction.
+        Lines starting with ";", "@", "|" or "/" are not script lines.
+
+        Parameters:
+            file (str): The path to the file to read.
+
+        Returns:
+            generator: Records (number, address, text, byte_length), number is the "@N" index of the line,
+                       address and byte_length come from its ";ADDR{text}#chars#bytes" comment
+                       (None when the script doesn't have them).
+        """
+        number = None
+        address = None
+        byte_length = None
+        with open(file, "r", encoding='UTF-8') as f:
+            # Skip the pointers header
+            f.readline()
+            for line in f:
+                if line.startswith("@"):
+                    number = int(line[1:]) if line[1:].strip().isdigit() else None
+                    address = None
+                    byte_length = None
+                elif line.startswith(";"):
+                    match = SCRIPT_COMMENT.match(line.rstrip("\n"))
+                    if match:
+                        address = int(match.group(1), 16)
+                        byte_length = int(match.group(2))
+                elif not (line.startswith("|") or line.startswith("/")):
+                    yield number, address, line.rstrip('\n'), byte_length
+                    number = None
+                    address = None
+                    byte_length = None
 
     def read_tbl(tbl_file):
         """
@@ -50,31 +122,65 @@ class Encoder:
                 - char_table (dict): A dictionary where keys are byte sequences (as `bytes`) and values are strings (characters or sequences).
                 - chars_lengths (set): Set array with chain char lengths.
         """
-        char_table = {}
-        chars_lengths = set()
-
-        with open(tbl_file, "r", encoding="UTF-8") as f:
-            for line in f:
-                if not line or line.startswith(";") or line.startswith("/"):
-                    continue
-                if "=" in line:
-                    hex_value, chars = line.split("=", 1)
-                    chars = chars.strip('\n')
-                    try:
-                        if len(hex_value) % 2 != 0:
-                            print(f"Warning: '{hex_value}' is invalid! Skipped.")
-                            continue
-                        byte_key = bytes.fromhex(hex_value)
-                        char_table[chars] = byte_key
-                        chars_lengths.add(len(chars))
-                    except ValueError:
-                        print(f"Warning: '{hex_value}' is invalid! Skipped.")
-                        continue        
-        chars_lengths = sorted([l for l in chars_lengths if l > 0], reverse=True)
+        # Parsed once, then loaded from the compiled cache
+        _, char_table, chars_lengths = Table.load(tbl_file)
         
         return char_table, chars_lengths
 
-    def encode_script(text_script, end_lines, char_table, dict_lengths, not_use_end_lines, bracket_index):
+    def compile_tbl(char_table):
+        """
+        Compiles a character table into a string trie for longest-match encoding.
+
+        Every node is a tuple (children, value), children maps the next character to
+        another node and value is the encoded bytes when the path is a full sequence (else None).
+
+        Parameters:
+            char_table (dict): Dictionary that maps character sequences to byte values.
+
+        Returns:
+            tuple: The root node of the trie.
+        """
+        root = ({}, None)
+        for seq, value in char_table.items():
+            if not seq:
+                continue
+            node = root
+            for char in seq[:-1]:
+                children = node[0]
+                if char not in children:
+                    children[char] = ({}, None)
+                node = children[char]
+            children = node[0]
+            last = seq[-1]
+            if last in children:
+                children[last] = (children[last][0], value)
+            else:
+                children[last] = ({}, value)
+        return root
+
+    def compile_leaf_chars(root):
+        """
+        Collects the single chars of a string trie that never start a longer sequence,
+        a run of them is encoded with one str.translate call.
+
+        Parameters:
+            root (dict): Root children of the string trie returned by compile_tbl.
+
+        Returns:
+            tuple: Contains:
+                - leaf_table (dict): str.translate table, char code to its bytes as a latin-1 string.
+                - leaf_run (re.Pattern): Pattern matching a run of those chars (None if there are none).
+        """
+        leaf_table = {}
+        for char, (children, value) in root.items():
+            if not children and value is not None:
+                leaf_table[ord(char)] = value.decode('latin-1')
+        if not leaf_table:
+            return leaf_table, None
+        leaf_run = re.compile("[" + "".join(re.escape(chr(code)) for code in leaf_table) + "]+")
+        return leaf_table, leaf_run
+
+    def encode_script(text_script, end_lines, char_table, dict_lengths, not_use_end_lines, bracket_index, optimal=False, line_cache=None):
         """
         Encodes the text into bytes using DTE/MTE encoding schemes with multibyte support.
         
@@ -82,103 +188,393 @@ class Encoder:
             text_script (list): List of text strings to encode.
             end_lines (set): A set the end lines used in the split pointers.
             char_table (dict): Dictionary that maps character sequences to byte values.
-            longest_char (int): Maximum length of sequences to consider while encoding.
+            dict_lengths (list): Sequence lengths in the table (kept for compatibility, the trie already knows them).
             ignore_end_lines (bool): Whether to ignore end lines or not.
             bracket_index (int): Determines which type of character bracket is used in the encoding process.
+            optimal (bool): Encode every text part with the fewest bytes instead of the greedy longest match.
+            line_cache (dict): Encoded lines by line text, reused and filled (see InsertCache).
         
         Returns:
             tuple: A tuple containing:
                 - encoded_data (bytearray): The encoded text data.
                 - pointers (list): List of pointers (cumulative lengths).
         """
-        if bracket_index == 0:
-            raw_byte = r'(~[0-9A-Fa-f]{2}~)'
-            hex_code = r'~([0-9A-Fa-f]{2})~'
-        elif bracket_index == 1:
-            raw_byte = r'(\[[0-9A-Fa-f]{2}\])'
-            hex_code = r'\[([0-9A-Fa-f]{2})\]'
-        elif bracket_index == 2:
-            raw_byte = r'(\{[0-9A-Fa-f]{2}\})'
-            hex_code = r'\{([0-9A-Fa-f]{2})\}'
-        elif bracket_index == 3:
-            raw_byte = r'(<[0-9A-Fa-f]{2}>)'
-            hex_code = r'<([0-9A-Fa-f]{2})>'
+        tokenizer = Encoder.compile_tokenizer(bracket_index)
+        compiled = Encoder.compile_encoder(char_table)
 
         encoded_data = bytearray()
-        total_bytes = 0
         cumulative_length = [0]
 
         for line in text_script:
-            # Split lines if raw byte are encounter
-            parts = []
-            split_line = re.split(raw_byte, line)
-            split_line = [part for part in split_line if part]
-            parts.extend(split_line)
-            
-            # Process each sub-line
-            processed_sub_lines = []
-            for part in parts:
-                # Search for repeat pointer function
-                if part.startswith("&"):
-                    cumulative_length.pop()
-                    copy_length = total_bytes
-                    total_bytes = cumulative_length[-1]
-                    cumulative_length.append(total_bytes)
-                    total_bytes = copy_length
-                    continue
-                
-                # If is a raw byte
-                elif re.match(hex_code, part):
-                    processed_sub_lines.append(bytes([int(part[1:3], 16)])) 
-                    total_bytes += 1
-
+            if line_cache is None:
+                has_repeat, last_part = Encoder.encode_line(line, tokenizer, compiled, optimal, encoded_data)
+            else:
+                # Lines are stored as (bytes, has_repeat, last_part relative to the line)
+                line_start = len(encoded_data)
+                cached = line_cache.get(line)
+                if cached is None:
+                    has_repeat, last_part = Encoder.encode_line(line, tokenizer, compiled, optimal, encoded_data)
+                    line_cache[line] = (bytes(encoded_data[line_start:]), has_repeat, None if last_part is None else last_part - line_start)
                 else:
-                    # If is a char
-                    i = 0
-                    encoded_sub_lines = bytearray()
-                    while i < len(part):
-                        #print(f"Position {i}: checking '{part[i:]}'")
-                        # Searching for sequences based on the longest char (DTE/MTE Algorithm)
-                        for length in dict_lengths:
-                            seq = part[i:i+length]
-                            if seq in char_table:
-                                #Depuring(ignore)
-                                #print(f"Matched: {seq} -> {char_table[seq].hex()} (text len: {length}, encoded bytes: {len(char_table[seq])})")
-                                encoded_sub_lines.extend(char_table[seq])
-                                total_bytes += len(char_table[seq])
-                                i += length
-                                break
-                        else:
-                            # If not encounter anyone encode by ASCII form.
-                            encoded_sub_lines.append(ord(part[i]))
-                            total_bytes += 1
-                            i += 1
-                    
-                    # Add the encoded
-                    processed_sub_lines.append(encoded_sub_lines)
-
-            # Add sub-lines to final line
-            encoded_line = bytearray()
-            for sub_line in processed_sub_lines:
-                encoded_line.extend(sub_line)
-
-            # Add the processed line to the final result
-            encoded_data.extend(encoded_line)
+                    line_data, has_repeat, last_part = cached
+                    encoded_data.extend(line_data)
+                    if last_part is not None:
+                        last_part += line_start
+
+            # Repeat pointer function, reuse the previous pointer
+            if has_repeat:
+                cumulative_length[-1] = cumulative_length[-2]
 
             # Split pointer by line length in script
             if not_use_end_lines:
-                cumulative_length.append(total_bytes)
+                cumulative_length.append(len(encoded_data))
             else:
-            # Split pointer by end lines code
+            # Split pointer by end lines code (searched in the last raw byte or text run)
+                if last_part is not None:
+                    sub_line = encoded_data[last_part:]
                 for char in sub_line:
                     if char in end_lines:
-                        cumulative_length.append(total_bytes)
+                        cumulative_length.append(len(encoded_data))
 
         # Remove last pointer
         cumulative_length.pop()
 
         return encoded_data, len(encoded_data), cumulative_length
 
+    def encode_script_parallel(text_script, end_lines, char_table, dict_lengths, not_use_end_lines, bracket_index, optimal, jobs, line_cache=None):
+        """
+        Same as encode_script, but the distinct lines are encoded by a pool of worker processes.
+        The encoded lines are then assembled in script order by encode_script, so the pointers
+        (a running sum of the line lengths) and the "&" repeat markers are handled as usual.
+
+        Parameters:
+            jobs (int): Number of worker processes.
+
+        Returns:
+            tuple: Same as encode_script.
+        """
+        if line_cache is None:
+            line_cache = {}
+        pending = list(dict.fromkeys(line for line in text_script if line not in line_cache))
+
+        if pending:
+            # A few chunks per worker keeps the pool balanced
+            chunk_size = max(1, -(-len(pending) // (jobs * 4)))
+            chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+            with ProcessPoolExecutor(max_workers=jobs, initializer=init_encode_worker, initargs=(char_table, bracket_index, optimal)) as pool:
+                for chunk, encoded_lines in zip(chunks, pool.map(encode_worker_chunk, chunks)):
+                    line_cache.update(zip(chunk, encoded_lines))
+
+        return Encoder.encode_script(text_script, end_lines, char_table, dict_lengths, not_use_end_lines, bracket_index, optimal, line_cache)
+
+    def pool_strings(encoded_data, cumulative_length, end_lines, merge_suffixes):
+        """
+        Stores identical strings once and points all their pointers to that copy (end line mode only).
+        A string is the data from a pointer to the next one, it is only shared when it contains
+        an end line code, so the text read from the copy is the same.
+
+        Parameters:
+            encoded_data (bytearray): The encoded text data.
+            cumulative_length (list): The pointers (cumulative lengths) returned by encode_script.
+            end_lines (set): The end line codes.
+            merge_suffixes (bool): Also store strings that are the ending of a longer one inside it.
+
+        Returns:
+            tuple: A tuple containing:
+                - encoded_data (bytearray): The pooled text data.
+                - pointers (list): List of pointers into the pooled data.
+        """
+        if not cumulative_length:
+            return encoded_data, cumulative_length
+
+        starts = sorted(set(cumulative_length))
+        ends = starts[1:] + [len(encoded_data)]
+        end_codes = [bytes([code]) for code in end_lines]
+        strings = [bytes(encoded_data[start:end]) for start, end in zip(starts, ends)]
+        terminated = [any(code in string for code in end_codes) for string in strings]
+
+        # Strings by content, the first copy is kept. A string after one without end line
+        # is read as its continuation, so it stays where it is.
+        kept = {}
+        shared = []
+        for i, string in enumerate(strings):
+            movable = terminated[i] and (i == 0 or terminated[i - 1])
+            if movable and string in kept:
+                shared.append(True)
+                continue
+            if terminated[i] and string not in kept:
+                kept[string] = i
+            shared.append(False)
+        # Host string and offset in it of every kept string
+        hosts = {string: (string, 0) for string in kept}
+
+        if merge_suffixes:
+            # A string is a suffix of another when its reversed bytes are a prefix of the next one in sorted order
+            reversed_strings = sorted(string[::-1] for string in kept)
+            for i in range(len(reversed_strings) - 2, -1, -1):
+                if reversed_strings[i + 1].startswith(reversed_strings[i]):
+                    string = reversed_strings[i][::-1]
+                    host = hosts[reversed_strings[i + 1][::-1]][0]
+                    hosts[string] = (host, len(host) - len(string))
+            for string, i in kept.items():
+                if hosts[string][0] != string and (i == 0 or terminated[i - 1]):
+                    shared[i] = True
+
+        # Rebuild the data without the shared strings
+        pooled_data = bytearray()
+        new_starts = {}
+        for i, string in enumerate(strings):
+            if not shared[i]:
+                new_starts[starts[i]] = len(pooled_data)
+                pooled_data += string
+        for i, string in enumerate(strings):
+            if shared[i]:
+                host, offset = hosts[string]
+                new_starts[starts[i]] = new_starts[starts[kept[host]]] + offset
+
+        return pooled_data, [new_starts[pointer] for pointer in cumulative_length]
+
+    def compile_tokenizer(bracket_index):
+        """
+        Compiles the tokenizer of script lines for a bracket style, it is built once and reused.
+        Every match is a raw byte (group 1, its hex digits) or the text run between raw bytes (group 2).
+
+        Parameters:
+            bracket_index (int): Determines which type of character bracket is used for raw bytes.
+
+        Returns:
+            re.Pattern: The compiled tokenizer.
+        """
+        tokenizer = TOKENIZERS.get(bracket_index)
+        if tokenizer is None:
+            open_bracket, close_bracket = map(re.escape, BRACKETS[bracket_index])
+            raw_byte = open_bracket + "([0-9A-Fa-f]{2})" + close_bracket
+            any_raw_byte = open_bracket + "[0-9A-Fa-f]{2}" + close_bracket
+            tokenizer = re.compile(raw_byte + "|((?:(?!" + any_raw_byte + ").)+)", re.DOTALL)
+            TOKENIZERS[bracket_index] = tokenizer
+        return tokenizer
+
+    def compile_encoder(char_table):
+        """
+        Compiles a character table for encode_line.
+
+        Parameters:
+            char_table (dict): Dictionary that maps character sequences to byte values.
+
+        Returns:
+            tuple: Contains:
+                - root_get (method): get of the root children of the string trie.
+                - leaf_table (dict): str.translate table of the chars encoded in bulk.
+                - leaf_match (method): match of the pattern for a run of those chars (None if there are none).
+        """
+        root = Encoder.compile_tbl(char_table)[0]
+        leaf_table, leaf_run = Encoder.compile_leaf_chars(root)
+        leaf_match = leaf_run.match if leaf_run is not None else None
+        return root.get, leaf_table, leaf_match
+
+    def encode_line(line, tokenizer, compiled, optimal, encoded_data):
+        """
+        Encodes one script line at the end of encoded_data.
+
+        Parameters:
+            line (str): The script line.
+            tokenizer (re.Pattern): Tokenizer returned by compile_tokenizer.
+            compiled (tuple): Table returned by compile_encoder.
+            optimal (bool): Encode text runs with the fewest bytes instead of the greedy longest match.
+            encoded_data (bytearray): The encoded script, the line is appended to it.
+
+        Returns:
+            tuple: Contains:
+                - has_repeat (bool): The line has a "&" repeat pointer marker.
+                - last_part (int): Offset in encoded_data of the last raw byte or text run (None if the line has none).
+        """
+        has_repeat = False
+        last_part = None
+
+        for token in tokenizer.finditer(line):
+            raw_byte = token.group(1)
+            # If is a raw byte
+            if raw_byte is not None:
+                last_part = len(encoded_data)
+                encoded_data.append(int(raw_byte, 16))
+                continue
+
+            # Search for repeat pointer function (the run is not encoded)
+            part = token.group(2)
+            if part[0] == "&":
+                has_repeat = True
+                continue
+
+            # If is a char
+            last_part = len(encoded_data)
+            if optimal:
+                encoded_data.extend(Encoder.encode_optimal(part, compiled[0]))
+            else:
+                Encoder.encode_greedy(part, compiled, encoded_data)
+
+        return has_repeat, last_part
+
+    def encode_greedy(part, compiled, encoded_data):
+        """
+        Encodes a text run with the longest sequence at each position (DTE/MTE Algorithm).
+
+        Parameters:
+            part (str): The text to encode.
+            compiled (tuple): Table returned by compile_encoder.
+            encoded_data (bytearray): The encoded script, the text is appended to it.
+        """
+        root_get, leaf_table, leaf_match = compiled
+        i = 0
+        part_length = len(part)
+        while i < part_length:
+            node = root_get(part[i])
+            if node is None:
+                # If not encounter anyone encode by ASCII form.
+                encoded_data.append(ord(part[i]))
+                i += 1
+                continue
+
+            # Single chars that never start a longer sequence are encoded in bulk
+            if not node[0] and leaf_match is not None:
+                run = leaf_match(part, i)
+                encoded_data.extend(run.group().translate(leaf_table).encode('latin-1'))
+                i = run.end()
+                continue
+
+            # Walk the trie to find the longest sequence
+            children, match_value = node
+            match_length = 1
+            pos = i + 1
+            while children and pos < part_length:
+                node = children.get(part[pos])
+                if node is None:
+                    break
+                pos += 1
+                children, value = node
+                if value is not None:
+                    match_length = pos - i
+                    match_value = value
+
+            if match_value is not None:
+                encoded_data.extend(match_value)
+                i += match_length
+            else:
+                # Only a longer sequence starts here
+                encoded_data.append(ord(part[i]))
+                i += 1
+
+    def encode_optimal(part, root_get):
+        """
+        Encodes a text part with the fewest bytes, as a shortest path over every table
+        sequence matching at each position (DTE/MTE overlaps like [th][e ] vs [t][he][ ]).
+        A char is encoded by its ASCII form only where no sequence of the table matches.
+
+        Parameters:
+            part (str): The text to encode.
+            root_get (method): get of the root children of the string trie returned by compile_tbl.
+
+        Returns:
+            bytearray: The encoded text.
+        """
+        part_length = len(part)
+        cost = [0] * (part_length + 1)
+        choice_length = [1] * part_length
+        choice_value = [None] * part_length
+
+        # Cheapest encoding of every suffix, from the end
+        for i in range(part_length - 1, -1, -1):
+            node = root_get(part[i])
+            if node is None:
+                cost[i] = cost[i + 1] + 1
+                continue
+
+            children, value = node
+            best_cost = None
+            if value is not None:
+                best_cost = len(value) + cost[i + 1]
+                choice_value[i] = value
+            pos = i + 1
+            while children and pos < part_length:
+                node = children.get(part[pos])
+                if node is None:
+                    break
+                pos += 1
+                children, value = node
+                if value is not None:
+                    total = len(value) + cost[pos]
+                    # Ties keep the longer sequence, like the greedy encoder
+                    if best_cost is None or total <= best_cost:
+                        best_cost = total
+                        choice_length[i] = pos - i
+                        choice_value[i] = value
+
+            if best_cost is None:
+                # Only a longer sequence starts here
+                best_cost = cost[i + 1] + 1
+            cost[i] = best_cost
+
+        encoded = bytearray()
+        i = 0
+        while i < part_length:
+            value = choice_value[i]
+            if value is None:
+                encoded.append(ord(part[i]))
+            else:
+                encoded.extend(value)
+            i += choice_length[i]
+        return encoded
+
+    def pack_pointers(list_cumulative_length, first_pointer, relative_start, base, width, endianness):
+        """
+        Serializes a whole pointer table at once, pointers of any width and endianness.
+
+        Parameters:
+            list_cumulative_length (list): A list of cumulative pointer lengths to adjust.
+            first_pointer (int): The first pointer to add to each cumulative length.
+            relative_start (bool): If start count is the script block or total size rom.
+            base (int): The base address to subtract from each pointer.
+            width (int): The size of a pointer in bytes.
+            endianness (int): The endianness (0 for little-endian, 1 for big-endian).
+
+        Returns:
+            bytearray: The encoded pointer data.
+
+        Raises:
+            ValueError: If a pointer doesn't fit in the width.
+        """
+        if relative_start:
+            first_pointer = 0
+        offset = first_pointer - base
+        pointers = [ptr + offset for ptr in list_cumulative_length]
+        Encoder.check_pointers(pointers, width)
+
+        byte_order = "<" if endianness == 0 else ">"
+        size = next((size for size in POINTER_FORMATS if size >= width), None)
+        if size is None:
+            return bytearray(b"".join(ptr.to_bytes(width, "little" if endianness == 0 else "big") for ptr in pointers))
+
+        packed = struct.pack(f"{byte_order}{len(pointers)}{POINTER_FORMATS[size]}", *pointers)
+        if size == width:
+            return bytearray(packed)
+        # Drop the unused high bytes of every pointer
+        pointers_data = bytearray(len(pointers) * width)
+        skip = 0 if endianness == 0 else size - width
+        for i in range(width):
+            pointers_data[i::width] = packed[skip + i::size]
+        return pointers_data
+
+    def check_pointers(pointers, width):
+        """
+        Raises ValueError if a pointer is negative or too big for the width.
+        """
+        limit = 1 << (8 * width)
+        if not pointers or (min(pointers) >= 0 and max(pointers) < limit):
+            return
+        for i, ptr in enumerate(pointers):
+            if not 0 <= ptr < limit:
+                ptr_display = f"-0x{abs(ptr):X}" if ptr < 0 else f"0x{ptr:X}"
+                raise ValueError(f"Pointer {i + 1} ({ptr_display}) doesn't fit in {width} bytes, check the base address.")
+
     def calculate_pointers_2_bytes(list_cumulative_length, first_pointer, relative_start, base, endianness):
         """
         Calculates pointer data by adjusting each pointer with the header size 
@@ -196,19 +592,7 @@ class Encoder:
                 - pointers_data (bytearray): The encoded pointer data in little-endian format.
                 - data_length (int): The length of the encoded pointer data.
         """
-        pointers_data = bytearray()
-        if relative_start:
-            first_pointer = 0
-        pointers_list = [ptr + first_pointer for ptr in list_cumulative_length]
-        pointers_list = [ptr - base for ptr in pointers_list]
-        if endianness == 0:
-            for ptr in pointers_list:
-                pointers_data.append(ptr & 0xFF)                 
-                pointers_data.append((ptr >> 8) & 0xFF)         
-        elif endianness == 1:
-            for ptr in pointers_list:
-                pointers_data.append((ptr >> 8) & 0xFF)
-                pointers_data.append(ptr & 0xFF)
+        pointers_data = Encoder.pack_pointers(list_cumulative_length, first_pointer, relative_start, base, 2, endianness)
         return pointers_data, len(pointers_data)
 
     def calculate_pointers_2_bytes_split(list_cumulative_length, first_pointer, relative_start, base):
@@ -220,7 +604,6 @@ class Encoder:
             first_pointer (int): The first pointer to add to each cumulative length.
             relative_start (bool): If start count is the script block or total size rom.
             base (int): The base address to subtract from each pointer.
-            endianness (int): The endianness (0 for little-endian, 1 for big-endian).
 
         Returns:
             tuple: Contains:
@@ -228,16 +611,9 @@ class Encoder:
                 - msb_ptr (bytearray): Most significant byte values.
                 - data_length (int): The length of the byte arrays.
         """
-        lsb_ptr = bytearray()
-        msb_ptr = bytearray()
-        if relative_start:
-            first_pointer = 0
-        pointers_list = [ptr + first_pointer for ptr in list_cumulative_length]
-        pointers_list = [ptr - base for ptr in pointers_list]
-
-        for ptr in pointers_list:
-            lsb_ptr.append(ptr & 0xFF)
-            msb_ptr.append((ptr >> 8) & 0xFF)
+        pointers_data = Encoder.pack_pointers(list_cumulative_length, first_pointer, relative_start, base, 2, 0)
+        lsb_ptr = pointers_data[0::2]
+        msb_ptr = pointers_data[1::2]
         return lsb_ptr, msb_ptr, len(lsb_ptr)
 
     def calculate_pointers_3_bytes(list_cumulative_length, first_pointer, relative_start, base, endianness):
@@ -258,21 +634,7 @@ class Encoder:
                 - pointers_data (bytearray): The encoded pointer data.
                 - data_length (int): The length of the encoded pointer data.
         """
-        pointers_data = bytearray()
-        if relative_start:
-            first_pointer = 0
-        pointers_list = [ptr + first_pointer for ptr in list_cumulative_length]
-        pointers_list = [ptr - base for ptr in pointers_list]
-        if endianness == 0:
-            for ptr in pointers_list: 
-                pointers_data.append(ptr & 0xFF)
-                pointers_data.append((ptr >> 8) & 0xFF)
-                pointers_data.append((ptr >> 16) & 0xFF)
-        elif endianness == 1:
-            for ptr in pointers_list:
-                pointers_data.append((ptr >> 16) & 0xFF)
-                pointers_data.append((ptr >> 8) & 0xFF)
-                pointers_data.append(ptr & 0xFF)
+        pointers_data = Encoder.pack_pointers(list_cumulative_length, first_pointer, relative_start, base, 3, endianness)
         return pointers_data, len(pointers_data)
         
     def calculate_pointers_4_bytes(list_cumulative_length, first_pointer, relative_start, base, endianness):
@@ -292,32 +654,16 @@ class Encoder:
                 - pointers_data (bytearray): The encoded pointer data.
                 - data_length (int): The length of the encoded pointer data.
         """
-        pointers_data = bytearray()
-        if relative_start:
-            first_pointer = 0
-        pointers_list = [ptr + first_pointer for ptr in list_cumulative_length]
-        pointers_list = [ptr - base for ptr in pointers_list]
-        if endianness == 0:
-            for ptr in pointers_list:
-                pointers_data.append(ptr & 0xFF)
-                pointers_data.append((ptr >> 8) & 0xFF)
-                pointers_data.append((ptr >> 16) & 0xFF)
-                pointers_data.append((ptr >> 24) & 0xFF) 
-        elif endianness == 1:
-            for ptr in pointers_list:
-                pointers_data.append((ptr >> 24) & 0xFF)     
-                pointers_data.append((ptr >> 16) & 0xFF)
-                pointers_data.append((ptr >> 8) & 0xFF) 
-                pointers_data.append(ptr & 0xFF)
+        pointers_data = Encoder.pack_pointers(list_cumulative_length, first_pointer, relative_start, base, 4, endianness)
         return pointers_data, len(pointers_data)
 
 
-    def write_rom(rom_file, start_offset, original_size, data, fill_free_space, fill_free_space_byte):
+    def write_rom(rom_patch, start_offset, original_size, data, fill_free_space, fill_free_space_byte):
         """
-        Writes data to the ROM at the specified offset, filling any free space if requested.
+        Adds a write of data to the ROM patch at the specified offset, filling any free space if requested.
         
         Parameters:
-            rom_file (str): The path to the ROM file.
+            rom_patch (RomPatch): The pending writes to the ROM file.
             start_offset (int): The offset in the ROM file where data should be written.
             original_size (int): The original size of the data to ensure there is enough space for the write operation.
             data (bytes or bytearray): The data to write to the ROM.
@@ -332,7 +678,22 @@ class Encoder:
             filled_data = data + fill_free_space_byte * free_space
         else:
             filled_data = data    
-        with open(rom_file, "r+b") as f: 
-            f.seek(start_offset)
-            f.write(filled_data)
+        rom_patch.write(start_offset, filled_data)
         return free_space
+
+# Parallel encoding workers (state is per process)
+encode_worker = {}
+
+def init_encode_worker(char_table, bracket_index, optimal):
+    encode_worker["tokenizer"] = Encoder.compile_tokenizer(bracket_index)
+    encode_worker["compiled"] = Encoder.compile_encoder(char_table)
+    encode_worker["optimal"] = optimal
+
+def encode_worker_chunk(lines):
+    # Same layout as the line cache of encode_script
+    encoded_lines = []
+    for line in lines:
+        encoded_data = bytearray()
+        has_repeat, last_part = Encoder.encode_line(line, encode_worker["tokenizer"], encode_worker["compiled"], encode_worker["optimal"], encoded_data)
+        encoded_lines.append((bytes(encoded_data), has_repeat, last_part))
+    return encoded_lines
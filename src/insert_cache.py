@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+
+# Bump when the cached data layout changes
+CACHE_VERSION = 1
+
+# Bytes compared at once when looking for changed ranges
+COMPARE_BLOCK_SIZE = 256
+
+class InsertCache:
+    def __init__(self, script_file, tbl_file, rom_file, bracket_index, optimal):
+        """
+        Loads the results of the previous insertion of a script, stored next to it as plain JSON
+        (byte data as hex strings) so a cache shared with a script can't run code.
+        Encoded lines are reused while the .tbl, the brackets and the encoding mode are the same,
+        previous writes are reused while the ROM was not modified since.
+
+        Parameters:
+            script_file (str): The path to the script file.
+            tbl_file (str): The path to the .tbl file.
+            rom_file (str): The path to the ROM file.
+            bracket_index (int): Determines which type of character bracket is used for raw bytes.
+            optimal (bool): Optimal encoding mode.
+        """
+        self.cache_file = script_file + ".cache"
+        self.rom_file = rom_file
+        with open(tbl_file, "rb") as f:
+            tbl_hash = hashlib.sha1(f.read()).hexdigest()
+        self.key = (CACHE_VERSION, os.path.abspath(script_file), tbl_hash, bracket_index, bool(optimal))
+
+        # Encoded lines by line text, see Encoder.encode_script
+        self.lines = {}
+        # Data written by the previous insertion, by ROM offset
+        self.writes = {}
+        self.cached_lines = 0
+
+        try:
+            with open(self.cache_file, "r", encoding="UTF-8") as f:
+                cached = json.load(f)
+            if cached["key"] != list(self.key):
+                return
+            lines = {}
+            for line, (hex_data, has_repeat, last_part) in cached["lines"].items():
+                lines[line] = (bytes.fromhex(hex_data), bool(has_repeat), None if last_part is None else int(last_part))
+            writes = {}
+            if cached["rom"] == list(self.rom_state()):
+                writes = {int(offset): bytes.fromhex(hex_data) for offset, hex_data in cached["writes"].items()}
+        except Exception:
+            return
+        self.lines = lines
+        self.writes = writes
+        self.cached_lines = len(self.lines)
+
+    def rom_state(self):
+        """
+        Returns the path, size and modification time of the ROM, to detect changes made by other tools.
+        """
+        stat = os.stat(self.rom_file)
+        return (os.path.abspath(self.rom_file), stat.st_size, stat.st_mtime_ns)
+
+    def write_rom(self, rom_patch, start_offset, original_size, data, fill_free_space, fill_free_space_byte):
+        """
+        Same as Encoder.write_rom, but when the previous insertion wrote the same amount of bytes
+        at this offset only the changed ranges are written.
+
+        Returns:
+            int: The amount of free space left after writing the data.
+        """
+        free_space = int(original_size) - len(data)
+        if fill_free_space:
+            filled_data = bytes(data + fill_free_space_byte * free_space)
+        else:
+            filled_data = bytes(data)
+
+        previous = self.writes.get(start_offset)
+        if previous is not None and len(previous) == len(filled_data):
+            ranges = InsertCache.changed_ranges(previous, filled_data)
+        else:
+            ranges = [(0, len(filled_data))]
+
+        for start, end in ranges:
+            rom_patch.write(start_offset + start, filled_data[start:end])
+        self.writes[start_offset] = filled_data
+        return free_space
+
+    def changed_ranges(previous, data):
+        """
+        Finds the ranges where two buffers of the same size differ, adjacent blocks are merged.
+
+        Parameters:
+            previous (bytes): The data written before.
+            data (bytes): The new data.
+
+        Returns:
+            list: (start, end) ranges of data to write.
+        """
+        ranges = []
+        for start in range(0, len(data), COMPARE_BLOCK_SIZE):
+            end = min(start + COMPARE_BLOCK_SIZE, len(data))
+            if previous[start:end] == data[start:end]:
+                continue
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def save(self, text_script):
+        """
+        Stores the encoded lines of the script and the data written, lines no longer in the script are dropped.
+
+        Parameters:
+            text_script (list): The script lines of this insertion.
+        """
+        lines = {}
+        for line in text_script:
+            if line in self.lines and line not in lines:
+                line_data, has_repeat, last_part = self.lines[line]
+                lines[line] = [line_data.hex().upper(), has_repeat, last_part]
+        cached = {
+            "key": list(self.key),
+            "lines": lines,
+            "rom": list(self.rom_state()),
+            "writes": {str(offset): data.hex().upper() for offset, data in self.writes.items()}
+        }
+        temp_file = self.cache_file + ".tmp"
+        try:
+            with open(temp_file, "w", encoding="UTF-8") as f:
+                json.dump(cached, f, ensure_ascii=False)
+            os.replace(temp_file, self.cache_file)
+        except OSError:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
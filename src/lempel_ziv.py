@@ -1,4 +1,89 @@
-import bitstring
+from rom import RomView
+
+# Positions searched per match by LZ77 and by the optimal parsing
+MATCH_MAX_CHAIN = 128
+
+# Positions of a hash chain compared one by one before searching the longer prefixes directly
+MATCH_CHAIN_STEPS = 8
+
+# LZSS copy argument sizes tried, in bits
+LZSS_SOURCE_ARG_SIZES = (10, 11)
+LZSS_LENGTH_ARG_SIZES = (3, 4, 5)
+
+class _BitReader:
+    def __init__(self, data, bytepos=0):
+        """
+        Reads MSB-first bit fields from a memoryview of the data, without copying it.
+
+        Parameters:
+            data (bytes): The binary data to read from.
+            bytepos (int): The byte where reading starts.
+        """
+        self.data = memoryview(data)
+        self.len = len(self.data) * 8
+        self.pos = bytepos * 8
+
+    def read(self, size):
+        """
+        Reads a field of size bits as an unsigned integer, the bytes that hold it are loaded in one word.
+        Raises EOFError if there are not enough bits left.
+        """
+        start = self.pos
+        end = start + size
+        if end > self.len:
+            raise EOFError(f"Can't read {size} bits at bit {start}, only {self.len - start} left.")
+        last = (end + 7) >> 3
+        word = int.from_bytes(self.data[start >> 3:last], "big")
+        self.pos = end
+        return (word >> ((last << 3) - end)) & ((1 << size) - 1)
+
+    def read_bit(self):
+        """
+        Reads a single bit.
+        """
+        pos = self.pos
+        if pos >= self.len:
+            raise EOFError(f"Can't read 1 bit at bit {pos}, only 0 left.")
+        self.pos = pos + 1
+        return (self.data[pos >> 3] >> (7 - (pos & 7))) & 1
+
+    def bytealign(self):
+        """
+        Skips to the start of the next byte.
+        """
+        self.pos = (self.pos + 7) & ~7
+
+    @property
+    def bytepos(self):
+        return self.pos >> 3
+
+class _BitWriter:
+    def __init__(self):
+        """
+        Writes MSB-first bit fields into a bytearray, whole bytes are flushed as soon as they are complete.
+        """
+        self.data = bytearray()
+        self.value = 0
+        self.bits = 0
+
+    def write(self, value, size):
+        """
+        Appends the lowest size bits of value.
+        """
+        self.value = (self.value << size) | value
+        self.bits += size
+        while self.bits >= 8:
+            self.bits -= 8
+            self.data.append((self.value >> self.bits) & 0xFF)
+        self.value &= (1 << self.bits) - 1
+
+    def getvalue(self):
+        """
+        Returns the written bytes, the last one padded with zero bits.
+        """
+        if self.bits:
+            return bytes(self.data) + bytes([(self.value << (8 - self.bits)) & 0xFF])
+        return bytes(self.data)
 
 class Lempel_ziv:
     def __init__(self):
@@ -14,7 +99,7 @@ class Lempel_ziv:
 
         Returns:
             tuple: Contains:
-                - Full output: decompressed data + remaining ROM data (bytes).
+                - Full output: decompressed data + remaining ROM data (RomView, not concatenated).
                 - The size of the decompressed script.
                 - The final offset reached during decompression.
                 - The size of the compressed data.
@@ -50,8 +135,7 @@ class Lempel_ziv:
                         final_offset = pos - 1
                         compressed_size = final_offset - start_offset + 1
                         decompressed_script_size = len(decompressed_script)
-                        remaining_data = data[final_offset + 1:]
-                        full_output = bytes(decompressed_script) + remaining_data
+                        full_output = RomView(bytes(decompressed_script), memoryview(data)[final_offset + 1:])
                         return full_output, decompressed_script_size, final_offset, compressed_size
 
                     for _ in range(length):
@@ -60,8 +144,7 @@ class Lempel_ziv:
         final_offset = pos - 1
         compressed_size = final_offset - start_offset + 1
         decompressed_script_size = len(decompressed_script)
-        remaining_data = data[final_offset + 1:]
-        full_output = bytes(decompressed_script) + remaining_data
+        full_output = RomView(bytes(decompressed_script), memoryview(data)[final_offset + 1:])
 
         return full_output, decompressed_script_size, final_offset, compressed_size
     
@@ -75,7 +158,7 @@ class Lempel_ziv:
 
         Returns:
             tuple: Contains:
-                - Decompressed data (bytes).
+                - Decompressed data + remaining ROM data (RomView, not concatenated).
                 - The size of the decompressed data
                 - The final offset.
                 - The size of the compressed data.
@@ -83,33 +166,42 @@ class Lempel_ziv:
         BIT_PASTCOPY = 0
         BIT_LITERAL = 1
 
-        stream = bitstring.ConstBitStream(bytes=data)
-        stream.bytepos = start_offset
+        stream = _BitReader(data, start_offset)
 
         decompressed_script = bytearray()
 
-        copy_source_size = stream.read('uint:4')
-        copy_length_size = stream.read('uint:4')
+        copy_source_size = stream.read(4)
+        copy_length_size = stream.read(4)
+        copy_size = copy_source_size + copy_length_size
+        copy_length_mask = (1 << copy_length_size) - 1
+        read = stream.read
 
         while True:
             if stream.pos >= stream.len:
                 break
 
-            next_command = stream.read('bool')
+            next_command = stream.read_bit()
 
             if next_command == BIT_PASTCOPY:
-                copy_source = stream.read(copy_source_size).uint
-                copy_length = stream.read(copy_length_size).uint
+                # Both arguments are read in one field
+                copy = read(copy_size)
+                copy_source = copy >> copy_length_size
+                copy_length = copy & copy_length_mask
                 copy_length += 3
 
                 if copy_source == 0:
                     break
 
-                for _ in range(copy_length):
-                    decompressed_script.append(decompressed_script[-copy_source])
+                copy_start = len(decompressed_script) - copy_source
+                if copy_length <= copy_source and copy_start >= 0:
+                    # The copy doesn't overlap the bytes it writes
+                    decompressed_script += decompressed_script[copy_start:copy_start + copy_length]
+                else:
+                    for _ in range(copy_length):
+                        decompressed_script.append(decompressed_script[-copy_source])
 
             elif next_command == BIT_LITERAL:
-                literal_byte = stream.read('uint:8')
+                literal_byte = read(8)
                 decompressed_script.append(literal_byte)
 
         stream.bytealign()
@@ -117,8 +209,7 @@ class Lempel_ziv:
         compressed_script_size = script_end_offset - start_offset + 1
         decompressed_script_size = len(decompressed_script)
 
-        remaining_data = data[script_end_offset + 1:]
-        full_output = bytes(decompressed_script) + remaining_data
+        full_output = RomView(bytes(decompressed_script), memoryview(data)[script_end_offset + 1:])
 
         return full_output, decompressed_script_size, script_end_offset, compressed_script_size
 
@@ -133,16 +224,13 @@ class Lempel_ziv:
 
         Returns:
             tuple:
-                - Full output: decompressed data + remaining ROM data (bytes).
+                - Full output: decompressed data + remaining ROM data (RomView, not concatenated).
                 - Size of decompressed script (int).
                 - Final offset in input (int).
                 - Size of compressed data (int).
         """
-        import bitstring
-
-        # Convert input to bit stream and set starting position
-        stream = bitstring.ConstBitStream(bytes=data)
-        stream.bytepos = start_offset
+        # Read the data as a bit stream from the starting position
+        stream = _BitReader(data, start_offset)
 
         # Initialize dictionary with single-byte sequences
         dict_size = 256
@@ -153,7 +241,7 @@ class Lempel_ziv:
 
         try:
             while True:
-                code = stream.read(f"uint:{code_size}")
+                code = stream.read(code_size)
                 if code in dictionary:
                     entry = dictionary[code]
                 elif code == dict_size and prev_code is not None:
@@ -169,7 +257,7 @@ class Lempel_ziv:
 
                 prev_code = code
 
-        except bitstring.ReadError:
+        except EOFError:
             pass  # Reached end of stream
 
         stream.bytealign()
@@ -177,18 +265,18 @@ class Lempel_ziv:
         compressed_script_size = script_end_offset - start_offset + 1
         decompressed_script_size = len(decompressed_script)
 
-        # Append remaining data from the ROM
-        remaining_data = data[script_end_offset + 1:]
-        full_output = bytes(decompressed_script) + remaining_data
+        # Followed by the remaining data of the ROM
+        full_output = RomView(bytes(decompressed_script), memoryview(data)[script_end_offset + 1:])
 
         return full_output, decompressed_script_size, script_end_offset, compressed_script_size
 
-    def compress_lz77(data):
+    def compress_lz77(data, optimal=False):
         """
         Compress data using a simple LZ77 algorithm with 12-bit offset and 4-bit length format.
 
         Parameters:
             data (bytearray): The data to compress.
+            optimal (bool): Choose the tokens with the fewest bits instead of the longest match at every step (optional).
 
         Returns:
             tuple:
@@ -196,6 +284,7 @@ class Lempel_ziv:
                 - Compressed size (int).
                 - Uncompressed size (int).
         """
+        data = bytes(data)
         compressed = bytearray()
         i = 0
         data_len = len(data)
@@ -205,6 +294,12 @@ class Lempel_ziv:
         MIN_MATCH = 3
         MAX_MATCH = MIN_MATCH + 0xF  # 4-bit length: 0-15 -> actual 3–18
 
+        matches = Lempel_ziv.match_index(data, WINDOW_SIZE, MAX_MATCH, MATCH_MAX_CHAIN)
+
+        # Optimal parsing: the length of every token is chosen up front (literal 9 bits, reference 17 bits with its flag)
+        if optimal:
+            steps = Lempel_ziv.optimal_parse([found[-1][1] if found else 0 for found in matches], 9, 17)
+
         while i < data_len:
             flags = 0
             flag_pos = len(compressed)
@@ -216,20 +311,15 @@ class Lempel_ziv:
                 if i >= data_len:
                     break
 
-                match_offset = 0
-                match_length = 0
-
-                # Search window
-                start_index = max(0, i - WINDOW_SIZE)
-                max_length = min(MAX_MATCH, data_len - i)
-
-                for j in range(start_index, i):
-                    length = 0
-                    while length < max_length and data[j + length] == data[i + length]:
-                        length += 1
-                    if length >= MIN_MATCH and length > match_length:
-                        match_offset = i - j
-                        match_length = length
+                if optimal:
+                    match_length = steps[i]
+                    match_offset = Lempel_ziv.match_source(matches[i], match_length) if match_length >= MIN_MATCH else 0
+                elif matches[i]:
+                    # The nearest of the longest matches
+                    match_offset, match_length = matches[i][-1]
+                else:
+                    match_offset = 0
+                    match_length = 0
 
                 if match_length >= MIN_MATCH:
                     # Write reference (2 bytes)
@@ -252,12 +342,14 @@ class Lempel_ziv:
 
         return compressed, len(compressed), decompressed_size
 
-    def compress_lzss(data):
+    def compress_lzss(data, optimal=False):
         """
         Compress LZSS algorithm from provided data.
+        Every pair of argument sizes is tried and the smallest output is kept, the matches are searched once for all of them.
         
         Parameters:
             data (bytearray): Script to compress.
+            optimal (bool): Choose the symbols with the fewest bits instead of the longest match at every step (optional).
         
         Returns:
             tuple:
@@ -267,78 +359,191 @@ class Lempel_ziv:
         """
         # Get decompressed size 
         decompressed_size = len(data)
-        
+        data = bytes(data)
+
+        # The widest arguments bound the search, narrower ones use part of it
+        max_source = (1 << LZSS_SOURCE_ARG_SIZES[-1]) - 1
+        max_length = (1 << LZSS_LENGTH_ARG_SIZES[-1]) - 1 + 3
+        # The optimal parsing bounds the search, the greedy copies come from the full search
+        matches = Lempel_ziv.match_index(data, max_source, max_length, MATCH_MAX_CHAIN if optimal else 0)
+
+        outputs = [Lempel_ziv.encode_lzss(data, matches, source_arg_size, length_arg_size, optimal) for source_arg_size in LZSS_SOURCE_ARG_SIZES for length_arg_size in LZSS_LENGTH_ARG_SIZES]
+
+        # The first of the smallest outputs
+        best_compressed_data = min(outputs, key=len)
+        return bytearray(best_compressed_data), len(best_compressed_data), decompressed_size
+
+    def match_index(data, max_source, max_length, max_chain=0):
+        """
+        Finds the matches of every position of data, with 3-byte prefix hash chains.
+        Only the first positions of a chain are compared one by one, after them every longer match
+        is the nearest earlier occurrence of a prefix one byte longer, found by bytes.rfind,
+        so data where a prefix repeats a lot (menus, tables) doesn't walk the whole chain.
+
+        Parameters:
+            data (bytes): Script to compress.
+            max_source (int): Largest copy distance.
+            max_length (int): Largest copy length.
+            max_chain (int): Positions searched per position, 0 searches all of them (optional).
+
+        Returns:
+            list: For every position a list of (distance, length) matches, nearest first,
+                  each one longer than the previous one (empty if there is no match of 3 bytes).
+        """
+        data_len = len(data)
+        head = {}
+        chain = [-1] * data_len
+        matches = []
+
+        for i in range(data_len):
+            found = []
+            limit = min(max_length, data_len - i)
+            if limit >= 3:
+                key = data[i:i + 3]
+                window_start = i - max_source
+                best = 2
+                steps = MATCH_CHAIN_STEPS
+                depth = max_chain if max_chain else data_len
+                j = head.get(key, -1)
+                while j >= window_start and j >= 0 and depth:
+                    depth -= 1
+                    if steps:
+                        steps -= 1
+                        # Only a longer match is worth comparing
+                        if data[j + best] != data[i + best]:
+                            j = chain[j]
+                            continue
+                        length = 3
+                    else:
+                        # Nearest position from j on that holds one more byte
+                        j = data.rfind(data[i:i + best + 1], max(0, window_start), j + best + 1)
+                        if j < 0:
+                            break
+                        length = best + 1
+                    # Compare 8 bytes at once, then the bytes left
+                    while length + 8 <= limit and data[j + length:j + length + 8] == data[i + length:i + length + 8]:
+                        length += 8
+                    while length < limit and data[j + length] == data[i + length]:
+                        length += 1
+                    if length > best:
+                        found.append((i - j, length))
+                        best = length
+                        if length == limit:
+                            break
+                    j = chain[j]
+                chain[i] = head.get(key, -1)
+                head[key] = i
+            matches.append(found)
+        return matches
+
+    def match_source(found, length):
+        """
+        Returns the distance of the nearest match of at least length bytes, from a list of match_index.
+        """
+        for source, match_length in found:
+            if match_length >= length:
+                return source
+        raise ValueError(f"No match of {length} bytes.")
+
+    def optimal_parse(max_lengths, literal_cost, copy_cost):
+        """
+        Chooses the tokens that encode the data with the lowest total cost (shortest path from the end).
+        A copy of max_lengths[i] bytes at position i can also copy any shorter length of at least 3 bytes.
+
+        Parameters:
+            max_lengths (list): Longest copy available at every position (0 if there is none).
+            literal_cost (int): Bits of a literal.
+            copy_cost (int): Bits of a copy.
+
+        Returns:
+            list: Bytes encoded by the token chosen at every position (1 for a literal).
+        """
+        data_len = len(max_lengths)
+        cost = [0] * (data_len + 1)
+        steps = [1] * data_len
+        for i in range(data_len - 1, -1, -1):
+            best_cost = cost[i + 1] + literal_cost
+            max_length = max_lengths[i]
+            if max_length >= 3:
+                # Cheapest end among the copy lengths, the longest one on ties
+                ends = cost[i + 3:i + max_length + 1]
+                end_cost = min(ends)
+                if end_cost + copy_cost <= best_cost:
+                    best_cost = end_cost + copy_cost
+                    steps[i] = max_length - ends[::-1].index(end_cost)
+            cost[i] = best_cost
+        return steps
+
+    def encode_lzss(data, matches, source_arg_size, length_arg_size, optimal=False):
+        """
+        Writes the LZSS stream of data for a pair of argument sizes.
+        For every copy the nearest of the longest matches that fit the arguments is used,
+        in optimal mode the copy lengths are chosen by optimal_parse.
+
+        Parameters:
+            data (bytes): Script to compress.
+            matches (list): Matches returned by match_index.
+            source_arg_size (int): Bits of the copy distance.
+            length_arg_size (int): Bits of the copy length.
+            optimal (bool): Choose the symbols with the fewest bits.
+
+        Returns:
+            bytes: The compressed data.
+        """
         # Define some useful constants.
         BIT_PASTCOPY = 0
         BIT_LITERAL = 1
 
-        # Initialize variables to store the best compressed data and its size
-        best_compressed_data = None
-        best_compressed_size = float('inf')
-        best_source_arg_size = 0
-        best_length_arg_size = 0
-
-        for source_arg_size in range(10, 12):
-            for length_arg_size in range(3, 6): 
-                current_index = 0
-                end_index = len(data)
-                output = bitstring.BitArray()
-                output.append(bitstring.pack('uint:4', source_arg_size))
-                output.append(bitstring.pack('uint:4', length_arg_size))
-
-                # Start compressing the input data
-                while current_index < end_index:
-                    best_source = 0
-                    best_length = 0
-
-                    # Limit the search for matching patterns based on the current source argument size
-                    search_limit = min(current_index, (1 << source_arg_size) - 1)
-
-                    # Search for the best match in the data
-                    for i in range(1, search_limit + 1):
-                        #Limit the length of the match based on the current length argument size
-                        lookahead_limit = min((1 << length_arg_size) - 1 + 3, end_index - current_index)
-                        current_length = 0
-                        for j in range(lookahead_limit):
-                            if data[current_index - i + j] == data[current_index + j]:
-                                current_length += 1
-                            else:
-                                break
-
-                        # Update the best match if the current match is longer
-                        if current_length > best_length:
-                            best_source = i
-                            best_length = current_length
-
-                    # If a match of at least 3 bytes is found, encode it as a past copy reference
-                    if best_length >= 3:
-                        output.append(bitstring.pack('uint:1', BIT_PASTCOPY))
-                        output.append(bitstring.pack('uint:n=v', n=source_arg_size, v=best_source))
-                        output.append(bitstring.pack('uint:n=v', n=length_arg_size, v=best_length - 3))
-                        current_index += best_length
-                    else:
-                        output.append(bitstring.pack('uint:1', BIT_LITERAL))
-                        output.append(bitstring.pack('uint:8', data[current_index]))
-                        current_index += 1
-
-                # End the compressed data with an additional past copy instruction
-                output.append(bitstring.pack('uint:1', BIT_PASTCOPY))
-                output.append(bitstring.pack('uint:n=v', n=source_arg_size, v=0))
-                output.append(bitstring.pack('uint:n=v', n=length_arg_size, v=0))
-
-                # Pad the output to make it byte-aligned if necessary
-                if len(output) % 8 != 0:
-                    output.append('0b' + '0' * (8 - len(output) % 8))
-                
-
-                # If the current compressed data is smaller than the best found so far, update the best data
-                if len(output.bytes) < best_compressed_size:
-                    best_compressed_data = output
-                    best_compressed_size = len(output.bytes)
-                    best_source_arg_size = source_arg_size
-                    best_length_arg_size = length_arg_size
-                    
-        return bytearray(best_compressed_data.bytes), best_compressed_size, decompressed_size
+        copy_size = 1 + source_arg_size + length_arg_size
+        max_source = (1 << source_arg_size) - 1
+        max_length = (1 << length_arg_size) - 1 + 3
+
+        output = _BitWriter()
+        output.write(source_arg_size, 4)
+        output.write(length_arg_size, 4)
+
+        if optimal:
+            # Longest copy that fits the arguments at every position
+            max_lengths = []
+            for found in matches:
+                best_length = 0
+                for source, length in found:
+                    if source > max_source:
+                        break
+                    best_length = length
+                max_lengths.append(min(best_length, max_length))
+            steps = Lempel_ziv.optimal_parse(max_lengths, 9, copy_size)
+
+        current_index = 0
+        end_index = len(data)
+        while current_index < end_index:
+            best_source = 0
+            best_length = 0
+            if optimal:
+                if steps[current_index] >= 3:
+                    best_length = steps[current_index]
+                    best_source = Lempel_ziv.match_source(matches[current_index], best_length)
+            else:
+                for source, length in matches[current_index]:
+                    if source > max_source:
+                        break
+                    if length > max_length:
+                        length = max_length
+                    if length > best_length:
+                        best_source = source
+                        best_length = length
+
+            # If a match of at least 3 bytes is found, encode it as a past copy reference
+            if best_length >= 3:
+                output.write((((BIT_PASTCOPY << source_arg_size) | best_source) << length_arg_size) | (best_length - 3), copy_size)
+                current_index += best_length
+            else:
+                output.write((BIT_LITERAL << 8) | data[current_index], 9)
+                current_index += 1
+
+        # End the compressed data with an additional past copy instruction
+        output.write(BIT_PASTCOPY, copy_size)
+        return output.getvalue()
 
     def compress_lzw(data, code_size=12):
         """
@@ -359,27 +564,24 @@ class Lempel_ziv:
         dict_size = 256
 
         w = b""
-        output_bits = bitstring.BitArray()
+        output_bits = _BitWriter()
 
         for c in data:
             wc = w + bytes([c])
             if wc in dictionary:
                 w = wc
             else:
-                output_bits.append(f"uint:{code_size}={dictionary[w]}")
+                output_bits.write(dictionary[w], code_size)
                 if dict_size < max_dict_size:
                     dictionary[wc] = dict_size
                     dict_size += 1
                 w = bytes([c])
 
         if w:
-            output_bits.append(f"uint:{code_size}={dictionary[w]}")
-
-        # Pad to byte alignment
-        if output_bits.len % 8 != 0:
-            output_bits.append(f"uint:{8 - (output_bits.len % 8)}=0")
+            output_bits.write(dictionary[w], code_size)
 
-        compressed_data = bytearray(output_bits.bytes)
+        # Padded to byte alignment
+        compressed_data = bytearray(output_bits.getvalue())
         compressed_size = len(compressed_data)
         decompressed_size = len(data)
 
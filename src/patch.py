@@ -0,0 +1,188 @@
+import os
+import zlib
+from rom import Rom
+
+# IPS records address 3 bytes and hold up to 0xFFFF bytes
+IPS_MAX_OFFSET = 0xFFFFFF
+IPS_MAX_RECORD = 0xFFFF
+# An IPS record starting here would be read as the "EOF" footer
+IPS_EOF_OFFSET = 0x454F46
+# Unchanged bytes between two changes are kept in one record when shorter than a record header
+IPS_RECORD_HEADER = 5
+
+# BPS actions
+BPS_SOURCE_READ = 0
+BPS_TARGET_READ = 1
+
+class Patch:
+    def write(patch_file, rom_patch):
+        """
+        Writes the pending writes of a RomPatch as an IPS or BPS patch (chosen by the extension),
+        the ROM is read to keep only the changed bytes but it is never copied nor modified.
+
+        Parameters:
+            patch_file (str): The path to the .ips or .bps file.
+            rom_patch (RomPatch): The writes of the insertion.
+
+        Returns:
+            int: The amount of changed bytes in the patch.
+        """
+        extension = os.path.splitext(patch_file)[1].lower()
+        if extension not in (".ips", ".bps"):
+            raise ValueError(f"Unsupported patch format '{extension}', use .ips or .bps")
+
+        with Rom(rom_patch.rom_file) as rom:
+            source = rom.data
+            runs, target_size = Patch.changed_runs(source, rom_patch.writes)
+            if extension == ".ips":
+                data = Patch.make_ips(source, runs)
+            else:
+                data = Patch.make_bps(source, runs, target_size)
+            del source
+
+        with open(patch_file, "wb") as f:
+            f.write(data)
+        return sum(len(run) for _, run in runs)
+
+    def changed_runs(source, writes):
+        """
+        Applies the writes over the touched regions of the source and keeps the bytes that differ.
+
+        Parameters:
+            source (bytes or memoryview): The original ROM.
+            writes (list): (offset, data) writes, later writes win where they overlap.
+
+        Returns:
+            tuple: Contains:
+                - runs (list): Sorted (offset, bytes) runs of changed bytes.
+                - target_size (int): The size of the patched ROM.
+        """
+        source_size = len(source)
+        target_size = max([source_size] + [offset + len(data) for offset, data in writes])
+        if target_size > source_size:
+            # Writing past the end pads the file with zeros
+            writes = [(source_size, bytes(target_size - source_size))] + list(writes)
+
+        # Merge the touched intervals into segments
+        segments = []
+        for start, end in sorted((offset, offset + len(data)) for offset, data in writes if data):
+            if segments and start <= segments[-1][1]:
+                segments[-1][1] = max(segments[-1][1], end)
+            else:
+                segments.append([start, end])
+
+        runs = []
+        for start, end in segments:
+            segment = bytearray(source[start:min(end, source_size)])
+            segment.extend(bytes(end - start - len(segment)))
+            for offset, data in writes:
+                if offset < end and offset + len(data) > start:
+                    lo = max(offset, start)
+                    hi = min(offset + len(data), end)
+                    segment[lo - start:hi - start] = data[lo - offset:hi - offset]
+
+            # Byte ranges that differ from the source, bytes past its end always differ
+            original = source[start:min(end, source_size)]
+            if segment == original:
+                continue
+            run_start = None
+            gap = 0
+            for i in range(end - start):
+                if i < len(original) and segment[i] == original[i]:
+                    if run_start is not None:
+                        gap += 1
+                        if gap >= IPS_RECORD_HEADER:
+                            runs.append((start + run_start, bytes(segment[run_start:i - gap + 1])))
+                            run_start = None
+                            gap = 0
+                    continue
+                if run_start is None:
+                    run_start = i
+                gap = 0
+            if run_start is not None:
+                runs.append((start + run_start, bytes(segment[run_start:end - start - gap])))
+
+        return runs, target_size
+
+    def make_ips(source, runs):
+        """
+        Builds an IPS patch from changed runs.
+
+        Parameters:
+            source (bytes or memoryview): The original ROM.
+            runs (list): Sorted (offset, bytes) runs of changed bytes.
+
+        Returns:
+            bytearray: The IPS patch.
+        """
+        patch = bytearray(b"PATCH")
+        for offset, data in runs:
+            if offset == IPS_EOF_OFFSET:
+                # Start one byte earlier, the byte is rewritten with its own value
+                offset -= 1
+                data = bytes(source[offset:offset + 1]) + data
+            position = 0
+            while position < len(data):
+                size = min(len(data) - position, IPS_MAX_RECORD)
+                if offset + position + size == IPS_EOF_OFFSET and position + size < len(data):
+                    # Split one byte earlier so the next record doesn't start at "EOF"
+                    size -= 1
+                record_offset = offset + position
+                if record_offset + size - 1 > IPS_MAX_OFFSET:
+                    raise ValueError(f"Offset 0x{record_offset:X} is out of the IPS range, use a .bps patch")
+                patch += record_offset.to_bytes(3, "big")
+                patch += size.to_bytes(2, "big")
+                patch += data[position:position + size]
+                position += size
+        patch += b"EOF"
+        return patch
+
+    def make_bps(source, runs, target_size):
+        """
+        Builds a BPS patch from changed runs, unchanged bytes are read from the source.
+
+        Parameters:
+            source (bytes or memoryview): The original ROM.
+            runs (list): Sorted (offset, bytes) runs of changed bytes.
+            target_size (int): The size of the patched ROM.
+
+        Returns:
+            bytearray: The BPS patch.
+        """
+        patch = bytearray(b"BPS1")
+        patch += Patch.bps_number(len(source))
+        patch += Patch.bps_number(target_size)
+        patch += Patch.bps_number(0)
+
+        target_crc = 0
+        position = 0
+        for offset, data in runs:
+            if offset > position:
+                patch += Patch.bps_number(((offset - position - 1) << 2) | BPS_SOURCE_READ)
+                target_crc = zlib.crc32(source[position:offset], target_crc)
+            patch += Patch.bps_number(((len(data) - 1) << 2) | BPS_TARGET_READ)
+            patch += data
+            target_crc = zlib.crc32(data, target_crc)
+            position = offset + len(data)
+        if target_size > position:
+            patch += Patch.bps_number(((target_size - position - 1) << 2) | BPS_SOURCE_READ)
+            target_crc = zlib.crc32(source[position:target_size], target_crc)
+
+        patch += zlib.crc32(source).to_bytes(4, "little")
+        patch += target_crc.to_bytes(4, "little")
+        patch += zlib.crc32(patch).to_bytes(4, "little")
+        return patch
+
+    def bps_number(value):
+        """
+        Encodes a number with the variable length encoding of BPS.
+        """
+        data = bytearray()
+        while True:
+            byte = value & 0x7F
+            value >>= 7
+            if value == 0:
+                data.append(0x80 | byte)
+                return data
+            data.append(byte)
+            value -= 1
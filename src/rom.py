@@ -0,0 +1,175 @@
+import mmap
+import os
+import shutil
+import tempfile
+
+class Rom:
+    def __init__(self, rom_file):
+        """
+        Opens a ROM file once and maps it in memory (read only).
+
+        Parameters:
+            rom_file (str): The path to the ROM file.
+        """
+        self.rom_file = rom_file
+        self.file = open(rom_file, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.data = memoryview(self.map)
+        except ValueError:
+            # Empty files can't be mapped
+            self.map = None
+            self.data = memoryview(b"")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.data)
+
+    def read(self, start_address, size):
+        """
+        Returns a segment of the ROM without copying it.
+
+        Parameters:
+            start_address (int): The starting position in the file to read from.
+            size (int): The number of bytes to read.
+
+        Returns:
+            memoryview: The data read from the ROM file.
+        """
+        return self.data[start_address:start_address + size]
+
+    def close(self):
+        """
+        Releases the memory map and closes the ROM file.
+        """
+        try:
+            self.data.release()
+        except BufferError:
+            pass
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                # A slice is still alive, the map is closed when it is collected
+                pass
+        self.file.close()
+
+class RomView:
+    def __init__(self, head, tail):
+        """
+        Read only view of some data followed by a part of the ROM, the two are not concatenated.
+        Used for decompressed scripts: the decoder reads the script at address 0 and the ROM after it.
+
+        Parameters:
+            head (bytes): The data at address 0.
+            tail (memoryview): The ROM data after it.
+        """
+        self.head = head
+        self.tail = tail
+        self.head_size = len(head)
+        self.size = self.head_size + len(tail)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.size)
+            if step != 1:
+                return bytes(self)[key]
+            if stop <= self.head_size:
+                return self.head[start:stop]
+            if start >= self.head_size:
+                return self.tail[start - self.head_size:stop - self.head_size]
+            # Only the requested range is copied
+            return self.head[start:] + bytes(self.tail[:stop - self.head_size])
+        if key < 0:
+            key += self.size
+        if 0 <= key < self.head_size:
+            return self.head[key]
+        if key < 0:
+            raise IndexError("index out of range")
+        return self.tail[key - self.head_size]
+
+    def __bytes__(self):
+        return bytes(self.head) + bytes(self.tail)
+
+class RomPatch:
+    def __init__(self, rom_file):
+        """
+        Collects the writes of an insertion in memory, they are applied together by commit.
+
+        Parameters:
+            rom_file (str): The path to the ROM file.
+        """
+        self.rom_file = rom_file
+        self.writes = []
+
+    def write(self, offset, data):
+        """
+        Adds a write, later writes win where they overlap.
+
+        Parameters:
+            offset (int): The offset in the ROM file where data should be written.
+            data (bytes or bytearray): The data to write.
+        """
+        self.writes.append((offset, bytes(data)))
+
+    def bytes_touched(self):
+        """
+        Returns the total size of the pending writes.
+        """
+        return sum(len(data) for _, data in self.writes)
+
+    def commit(self, atomic=False):
+        """
+        Applies all the pending writes in one pass.
+
+        Parameters:
+            atomic (bool): Write a patched copy next to the ROM and rename it over the ROM,
+                           an interrupted insertion then leaves the ROM untouched.
+
+        Returns:
+            int: Total bytes touched.
+        """
+        touched = self.bytes_touched()
+        if not self.writes:
+            return touched
+
+        if atomic:
+            directory = os.path.dirname(os.path.abspath(self.rom_file))
+            fd, temp_file = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "r+b") as f:
+                    with open(self.rom_file, "rb") as rom:
+                        shutil.copyfileobj(rom, f)
+                    self.apply(f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                shutil.copymode(self.rom_file, temp_file)
+                os.replace(temp_file, self.rom_file)
+            except BaseException:
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+                raise
+        else:
+            with open(self.rom_file, "r+b") as f:
+                self.apply(f)
+
+        self.writes = []
+        return touched
+
+    def apply(self, f):
+        """
+        Writes the pending writes to an open file, in the order they were added.
+        """
+        for offset, data in self.writes:
+            f.seek(offset)
+            f.write(data)
@@ -0,0 +1,151 @@
+import hashlib
+import io
+import json
+import os
+
+# Bump when the cached data layout changes
+CACHE_VERSION = 2
+
+class Table:
+    def load(tbl_file):
+        """
+        Loads a .tbl file, using the compiled cache next to it when it is still valid.
+        The cache is keyed by path, modification time and SHA-1 of the .tbl content.
+
+        Parameters:
+            tbl_file (str): The path to the .tbl file.
+
+        Returns:
+            tuple: Contains:
+                - decode_table (dict): Byte sequences (as `bytes`) to strings.
+                - encode_table (dict): Strings to byte sequences (as `bytes`).
+                - chars_lengths (list): Lengths of the strings, longest first.
+        """
+        with open(tbl_file, "rb") as f:
+            raw = f.read()
+
+        key = (CACHE_VERSION, os.path.abspath(tbl_file), os.stat(tbl_file).st_mtime_ns, hashlib.sha1(raw).hexdigest())
+        cache_file = tbl_file + ".cache"
+
+        entries = Table.read_cache(cache_file, key)
+        if entries is None:
+            entries = Table.parse(raw)
+            Table.write_cache(cache_file, key, entries)
+
+        codes, chars, warnings = entries
+        if warnings:
+            print("\n".join(warnings))
+        return Table.build(codes, chars)
+
+    def parse(raw):
+        """
+        Parses the content of a .tbl file (supports DTE/MTE, multibyte values).
+
+        Parameters:
+            raw (bytes): The content of the .tbl file.
+
+        Returns:
+            tuple: Contains:
+                - codes (list): Byte sequences (as `bytes`) of the entries, in file order.
+                - chars (list): Strings of the entries, in file order.
+                - warnings (list): Messages for the skipped entries.
+        """
+        codes = []
+        chars_list = []
+        warnings = []
+
+        with io.TextIOWrapper(io.BytesIO(raw), encoding="UTF-8") as f:
+            for line in f:
+                if not line or line.startswith(";") or line.startswith("/"):
+                    continue
+                if "=" in line:
+                    hex_value, chars = line.split("=", 1)
+                    chars = chars.strip("\n")
+                    try:
+                        if len(hex_value) % 2 != 0:
+                            warnings.append(f"Warning: '{hex_value}' is invalid! Skipped.")
+                            continue
+                        byte_key = bytes.fromhex(hex_value)
+                    except ValueError:
+                        warnings.append(f"Warning: '{hex_value}' is invalid! Skipped.")
+                        continue
+                    codes.append(byte_key)
+                    chars_list.append(chars)
+
+        return codes, chars_list, warnings
+
+    def build(codes, chars):
+        """
+        Builds the lookup tables from the entries of a .tbl file, later entries win.
+
+        Parameters:
+            codes (list): Byte sequences (as `bytes`) of the entries, in file order.
+            chars (list): Strings of the entries, in file order.
+
+        Returns:
+            tuple: Contains:
+                - decode_table (dict): Byte sequences (as `bytes`) to strings.
+                - encode_table (dict): Strings to byte sequences (as `bytes`).
+                - chars_lengths (list): Lengths of the strings, longest first.
+        """
+        decode_table = dict(zip(codes, chars))
+        encode_table = dict(zip(chars, codes))
+        chars_lengths = set(map(len, chars))
+        chars_lengths.discard(0)
+        return decode_table, encode_table, sorted(chars_lengths, reverse=True)
+
+    def read_cache(cache_file, key):
+        """
+        Reads a compiled table cache. It is plain JSON, so a shared cache can't run code, and holds
+        the entries as two newline-joined strings (hex codes and chars) that split back in C.
+
+        Parameters:
+            cache_file (str): The path to the cache file.
+            key (tuple): The key the cache must match.
+
+        Returns:
+            tuple: The cached entries, or None if the cache is missing, stale or malformed.
+        """
+        try:
+            with open(cache_file, "r", encoding="UTF-8") as f:
+                cached = json.load(f)
+            if cached["key"] != list(key):
+                return None
+            count = cached["count"]
+            # Lines never hold a newline, but one empty entry joins to the same "" as no entries
+            codes = list(map(bytes.fromhex, cached["codes"].split("\n"))) if count else []
+            chars = cached["chars"].split("\n") if count else []
+            warnings = [str(warning) for warning in cached["warnings"]]
+            if len(codes) != count or len(chars) != count:
+                return None
+        except Exception:
+            return None
+        return codes, chars, warnings
+
+    def write_cache(cache_file, key, entries):
+        """
+        Writes a compiled table cache, a read only folder just skips it.
+
+        Parameters:
+            cache_file (str): The path to the cache file.
+            key (tuple): The key of the .tbl file.
+            entries (tuple): The parsed entries.
+        """
+        codes, chars, warnings = entries
+        cached = {
+            "key": list(key),
+            "count": len(codes),
+            "codes": "\n".join(code.hex() for code in codes),
+            "chars": "\n".join(chars),
+            "warnings": warnings,
+        }
+        temp_file = cache_file + ".tmp"
+        try:
+            with open(temp_file, "w", encoding="UTF-8") as f:
+                json.dump(cached, f, ensure_ascii=False)
+            os.replace(temp_file, cache_file)
+        except OSError:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass